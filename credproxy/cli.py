@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import argparse
+import functools
 from typing import TYPE_CHECKING
 
 
@@ -16,8 +17,12 @@ from credproxy import __version__
 from credproxy.logger import LOG
 
 
+@functools.lru_cache(maxsize=1)
 def create_parser() -> argparse.ArgumentParser:
-    """Create the command-line argument parser."""
+    """Create the command-line argument parser.
+
+    The parser is built once and shared: parse_args does not mutate it.
+    """
     parser = argparse.ArgumentParser(
         prog="credproxy",
         description=(
@@ -3,7 +3,14 @@
 
 from __future__ import annotations
 
+import os
+import re
+import copy
 import json
+import hashlib
+import logging
+import tempfile
+import functools
 import threading
 from typing import Any
 from pathlib import Path
@@ -14,7 +21,7 @@ import jsonschema
 
 from credproxy.logger import LOG
 from credproxy.metrics import update_active_services
-from credproxy.settings import NAMESPACE, get_config_file
+from credproxy.settings import NAMESPACE, get_config_file, get_config_json_cache
 from credproxy.sanitizer import (
     register_sensitive_dict,
     register_sensitive_value,
@@ -25,6 +32,13 @@ from credproxy.sanitizer import (
 from credproxy.substitutions import substitute_variables
 
 
+try:
+    from yaml import CSafeLoader as _YAML_LOADER
+except ImportError:
+    # PyYAML built without libyaml
+    from yaml import SafeLoader as _YAML_LOADER
+
+
 def keyisset(key: str, data: dict) -> Any:
     """Check if key exists in dict and return value, raise if missing."""
     if key not in data:
@@ -37,7 +51,16 @@ def set_else_none(key: str, data: dict, default: Any) -> Any:
     return data.get(key, default)
 
 
-@dataclass
+def _copied(value: Any) -> Any:
+    """Return a private copy of a container taken from parsed config data.
+
+    Parsed files are shared through the parse cache, so containers stored on
+    config objects must not alias them.
+    """
+    return copy.deepcopy(value) if value is not None else None
+
+
+@dataclass(slots=True)
 class IAMProfileAuthConfig:
     """IAM profile authentication configuration."""
 
@@ -45,7 +68,7 @@ class IAMProfileAuthConfig:
     config_file: str | None = None  # Path to AWS config file
 
 
-@dataclass
+@dataclass(slots=True)
 class IAMKeysAuthConfig:
     """IAM access keys authentication configuration."""
 
@@ -54,7 +77,7 @@ class IAMKeysAuthConfig:
     session_token: str | None = None  # For temporary credentials
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceCredentialsConfig:
     """Source AWS credentials configuration."""
 
@@ -63,7 +86,7 @@ class SourceCredentialsConfig:
     iam_keys: IAMKeysAuthConfig | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AssumedRoleConfig:
     """AWS role assumption configuration."""
 
@@ -108,6 +131,16 @@ class DirectoryConfig:
     exclude_patterns: list[str] = field(default_factory=list)
 
 
+@functools.lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a directory include/exclude pattern, once per pattern string.
+
+    Raises:
+        re.error: If the pattern is not a valid regular expression
+    """
+    return re.compile(pattern)
+
+
 @dataclass
 class DynamicServicesConfig:
     """Dynamic services configuration settings."""
@@ -136,7 +169,7 @@ class MetricsConfig:
     prometheus: PrometheusConfig = field(default_factory=PrometheusConfig)
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceConfig:
     """Configuration for a single service."""
 
@@ -164,11 +197,11 @@ def _parse_directory_configs(
             return [
                 DirectoryConfig(
                     path=path,
-                    include_patterns=set_else_none(
-                        "include_patterns", dynamic_services_data, []
+                    include_patterns=list(
+                        set_else_none("include_patterns", dynamic_services_data, [])
                     ),
-                    exclude_patterns=set_else_none(
-                        "exclude_patterns", dynamic_services_data, []
+                    exclude_patterns=list(
+                        set_else_none("exclude_patterns", dynamic_services_data, [])
                     ),
                 )
                 for path in directories_data
@@ -178,14 +211,198 @@ def _parse_directory_configs(
             return [
                 DirectoryConfig(
                     path=dir_config["path"],
-                    include_patterns=set_else_none("include_patterns", dir_config, []),
-                    exclude_patterns=set_else_none("exclude_patterns", dir_config, []),
+                    include_patterns=list(
+                        set_else_none("include_patterns", dir_config, [])
+                    ),
+                    exclude_patterns=list(
+                        set_else_none("exclude_patterns", dir_config, [])
+                    ),
                 )
                 for dir_config in directories_data
             ]
     return [DirectoryConfig(path="/credproxy/dynamic")]
 
 
+_JSON_SIDECAR_SUFFIX = ".cache.json"
+
+
+def _read_json_sidecar(config_path: str, digest: str) -> Any:
+    """Return the JSON sidecar content if it was written for this file content.
+
+    Returns None when there is no usable sidecar.
+    """
+    sidecar = Path(config_path + _JSON_SIDECAR_SUFFIX)
+    try:
+        cached = json.loads(sidecar.read_bytes())
+    except (OSError, ValueError):
+        return None
+    # Match on the source content rather than comparing mtimes: mounted
+    # configurations can be swapped for a file older than the sidecar, or
+    # rewritten with the same size within one mtime tick
+    if not isinstance(cached, dict) or cached.get("sha256") != digest:
+        return None
+    return cached.get("data")
+
+
+def _write_json_sidecar(config_path: str, digest: str, config_data: Any) -> None:
+    """Atomically write parsed YAML as a JSON sidecar next to the file.
+
+    Skipped when the data does not survive a JSON round trip unchanged, such
+    as non-string keys or dates. Write failures, such as on read-only
+    filesystems, are only logged.
+    """
+    try:
+        encoded = json.dumps({"sha256": digest, "data": config_data})
+    except (TypeError, ValueError):
+        return
+    if json.loads(encoded)["data"] != config_data:
+        return
+
+    sidecar = Path(config_path + _JSON_SIDECAR_SUFFIX)
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=sidecar.parent, prefix=f".{sidecar.name}.")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(temp_path, sidecar)
+    except OSError as error:
+        LOG.debug("Could not write configuration cache %s: %s", sidecar, error)
+        if temp_path is not None:
+            Path(temp_path).unlink(missing_ok=True)
+
+
+@functools.lru_cache(maxsize=100)
+def _parse_config_file(
+    config_path: str, raw_content: bytes, json_sidecar: bool = False
+) -> Any:
+    """Parse the YAML or JSON content of a configuration file.
+
+    Memoized on the file content alongside its path, so an unchanged file is
+    only parsed once and any edit invalidates the entry, even one that keeps
+    the size and modification time. With json_sidecar, parsed YAML is also
+    kept in a JSON file next to the configuration, which is much faster to
+    load on the next start.
+    """
+    digest = ""
+    if json_sidecar:
+        digest = hashlib.sha256(raw_content).hexdigest()
+        config_data = _read_json_sidecar(config_path, digest)
+        if config_data is not None:
+            LOG.info("Loaded configuration from %s JSON cache", config_path)
+            return config_data
+
+    # Both parsers accept bytes, and libyaml can parse the buffer directly
+    # instead of going through a file reader wrapper
+    try:
+        config_data = yaml.load(raw_content, Loader=_YAML_LOADER)
+        LOG.info("Loaded configuration from %s as YAML", config_path)
+        if json_sidecar:
+            _write_json_sidecar(config_path, digest, config_data)
+    except yaml.YAMLError as error:
+        LOG.debug("YAML parsing failed, trying JSON")
+        try:
+            config_data = json.loads(raw_content)
+            LOG.info("Loaded configuration from %s as JSON", config_path)
+        except json.JSONDecodeError as json_error:
+            raise ValueError(
+                f"File is not valid YAML or JSON. YAML error: {error}, "
+                f"JSON error: {json_error}"
+            ) from error
+    return config_data
+
+
+@functools.lru_cache(maxsize=1)
+def _schema_validator(
+    schema_path: str, mtime_ns: int
+) -> jsonschema.protocols.Validator:
+    """Load the JSON schema, check it, and build a validator for it.
+
+    Memoized on the schema file modification time, so the schema is read and
+    checked once instead of on every validation.
+    """
+    with open(schema_path, encoding="utf-8") as f:
+        schema = json.load(f)
+
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def _lacks_services(config_data: Any) -> bool:
+    """Check whether a configuration cannot satisfy the schema's service sources.
+
+    Mirrors the schema's top-level anyOf: a non-empty services mapping, or a
+    dynamic_services section that is not disabled. Only the unambiguous cases
+    return True; anything else is left to the full schema validation.
+    """
+    if not isinstance(config_data, dict):
+        return False
+    if config_data.get("services", {}) != {}:
+        return False
+    if "dynamic_services" not in config_data:
+        return True
+    dynamic_services = config_data["dynamic_services"]
+    return (
+        isinstance(dynamic_services, dict)
+        and "enabled" in dynamic_services
+        and dynamic_services["enabled"] is not True
+    )
+
+
+def _region_pattern(schema_path: str, mtime_ns: int) -> re.Pattern | None:
+    """Compile source_credentials_config.region's pattern from the JSON schema.
+
+    Reading it from the schema keeps the region pre-check and the schema from
+    drifting apart. Returns None when the schema cannot provide it, leaving
+    the error to the full schema validation.
+    """
+    try:
+        schema = _schema_validator(schema_path, mtime_ns).schema
+        definition = schema["definitions"]["source_credentials_config"]
+        return compile_pattern(definition["properties"]["region"]["pattern"])
+    except (
+        OSError,
+        ValueError,
+        KeyError,
+        TypeError,
+        re.error,
+        jsonschema.SchemaError,
+    ) as error:
+        LOG.debug("No region pattern in JSON schema: %s", error)
+        return None
+
+
+def _invalid_region(
+    config_data: Any, region_pattern: re.Pattern
+) -> tuple[str, str] | None:
+    """Find the first region that the schema's region pattern would reject.
+
+    Checks aws_defaults and every static service's source_credentials. Returns
+    the error path and the offending region, or None. Values of the wrong type
+    are left to the full schema validation.
+    """
+    if not isinstance(config_data, dict):
+        return None
+    locations = [("aws_defaults", config_data.get("aws_defaults"))]
+    services = config_data.get("services")
+    if isinstance(services, dict):
+        locations.extend(
+            (
+                f"services -> {service_name} -> source_credentials",
+                service_config.get("source_credentials"),
+            )
+            for service_name, service_config in services.items()
+            if isinstance(service_config, dict)
+        )
+    for location, section in locations:
+        if not isinstance(section, dict):
+            continue
+        region = section.get("region")
+        if isinstance(region, str) and not region_pattern.search(region):
+            return f"{location} -> region", region
+    return None
+
+
 def merge_aws_config(defaults: dict, overrides: dict) -> dict:
     """Merge AWS configuration with defaults and service-specific overrides."""
     merged = defaults.copy() if defaults else {}
@@ -225,27 +442,34 @@ class Config:
         self._build_token_mapping()
 
     def _build_token_mapping(self):
-        """Build instant lookup mapping from tokens to service names."""
-        self._token_to_service.clear()
+        """Build instant lookup mapping from tokens to service names.
+
+        The mapping is built aside and swapped in with a single assignment, so
+        concurrent lookups never see it empty or half built and need no lock.
+        """
         LOG.info("Building token mapping for %d services", len(self.services))
+        token_to_service = {}
         for service_name, service_config in self.services.items():
-            self._token_to_service[service_config.auth_token] = service_name
+            token_to_service[service_config.auth_token] = service_name
             LOG.debug(
                 "Mapped token for service %s: %s...",
                 service_name,
                 service_config.auth_token[:8] + "...",
             )
+        self._token_to_service = token_to_service
         LOG.info(
             "Token mapping built successfully with %d services",
-            len(self._token_to_service),
+            len(token_to_service),
         )
 
     def get_service_name_by_token(self, token: str) -> str | None:
         """Get service name by authorization token."""
         service_name = self._token_to_service.get(token)
         LOG.info("Token lookup for %s...: %s", token[:8] + "...", service_name)
-        LOG.debug("Token registry contains %d tokens", len(self._token_to_service))
-        LOG.debug("Available services: %s", list(self.services.keys()))
+        # Listing the services is O(n): only do it when it will be logged
+        if LOG.isEnabledFor(logging.DEBUG):
+            LOG.debug("Token registry contains %d tokens", len(self._token_to_service))
+            LOG.debug("Available services: %s", list(self.services.keys()))
 
         if not service_name:
             LOG.warning("Token not found in registry: %s...", token[:8] + "...")
@@ -332,25 +556,23 @@ class Config:
                 config_path = env_config_path
 
         config_file = Path(config_path)
-        if not config_file.exists():
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
-
-        # Load raw YAML/JSON first
         try:
-            with open(config_file, encoding="utf-8") as f:
-                config_data = yaml.safe_load(f)
-            LOG.info("Loaded configuration from %s as YAML", config_path)
-        except yaml.YAMLError as error:
-            LOG.debug("YAML parsing failed, trying JSON")
-            try:
-                with open(config_file, encoding="utf-8") as f:
-                    config_data = json.load(f)
-                LOG.info("Loaded configuration from %s as JSON", config_path)
-            except json.JSONDecodeError as json_error:
-                raise ValueError(
-                    f"File is not valid YAML or JSON. YAML error: {error}, "
-                    f"JSON error: {json_error}"
-                ) from error
+            raw_content = config_file.read_bytes()
+        except FileNotFoundError as error:
+            raise FileNotFoundError(
+                f"Configuration file not found: {config_path}"
+            ) from error
+
+        # Load raw YAML/JSON first, reusing the previous parse if unchanged.
+        # The cached tree is shared as-is: from_dict never mutates its input and
+        # copies the few containers it keeps on the resulting config objects.
+        # The Config itself is always rebuilt: it is mutated by the dynamic
+        # services, and substitutions may resolve differently between loads.
+        config_data = _parse_config_file(
+            str(config_file.absolute()),
+            raw_content,
+            get_config_json_cache(NAMESPACE),
+        )
 
         return cls.from_dict(config_data, config_path)
 
@@ -516,10 +738,10 @@ class Config:
             RoleSessionName=set_else_none("RoleSessionName", data, "credproxy"),
             DurationSeconds=set_else_none("DurationSeconds", data, 900),
             ExternalId=set_else_none("ExternalId", data, None),
-            PolicyArns=set_else_none("PolicyArns", data, None),
+            PolicyArns=_copied(set_else_none("PolicyArns", data, None)),
             Policy=set_else_none("Policy", data, None),
-            Tags=set_else_none("Tags", data, None),
-            TransitiveTagKeys=set_else_none("TransitiveTagKeys", data, None),
+            Tags=_copied(set_else_none("Tags", data, None)),
+            TransitiveTagKeys=_copied(set_else_none("TransitiveTagKeys", data, None)),
             SerialNumber=set_else_none("SerialNumber", data, None),
             TokenCode=set_else_none("TokenCode", data, None),
             SourceIdentity=set_else_none("SourceIdentity", data, None),
@@ -560,12 +782,39 @@ class Config:
             LOG.warning("JSON schema file not found at %s", schema_path)
             return
 
+        if _lacks_services(config_data):
+            # Fail fast on the schema's top-level requirement, without running
+            # the full validator over the rest of the configuration
+            message = "no services defined and dynamic_services not enabled"
+            LOG.error("Configuration validation failed at root: %s", message)
+            raise ValueError(f"Configuration validation failed at root: {message}")
+
+        region_pattern = _region_pattern(
+            str(schema_path), schema_path.stat().st_mtime_ns
+        )
+        invalid_region = (
+            _invalid_region(config_data, region_pattern) if region_pattern else None
+        )
+        if invalid_region is not None:
+            # Report bad regions directly rather than through the schema
+            # pattern error, which dumps the whole regex
+            error_path, region = invalid_region
+            message = f"invalid AWS region '{region}'"
+            LOG.error("Configuration validation failed at %s: %s", error_path, message)
+            raise ValueError(
+                f"Configuration validation failed at {error_path}: {message}"
+            )
+
         try:
-            with open(schema_path, encoding="utf-8") as f:
-                schema = json.load(f)
+            validator = _schema_validator(
+                str(schema_path), schema_path.stat().st_mtime_ns
+            )
 
-            # Validate the config data
-            jsonschema.validate(config_data, schema)
+            # Validate the config data, reporting the most relevant error
+            # as jsonschema.validate does
+            error = jsonschema.exceptions.best_match(validator.iter_errors(config_data))
+            if error is not None:
+                raise error
             LOG.debug("Configuration validation against JSON schema passed")
 
         except jsonschema.ValidationError as error:
@@ -4,32 +4,66 @@
 from __future__ import annotations
 
 import time
+import asyncio
 import threading
-from typing import TYPE_CHECKING
-from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+from datetime import datetime, timezone
+from dataclasses import field, asdict, dataclass
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
 from botocore.exceptions import ClientError
 
 from credproxy.logger import LOG
 
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from credproxy.config import Config, ServiceConfig
 
 
-@dataclass
+# Upper bound on cached credential entries; the oldest refreshed are evicted first
+_CACHE_MAXSIZE = 1000
+
+
+class RefreshBackoffError(Exception):
+    """A recent refresh of the service credentials failed; not retried yet.
+
+    Raised from the original error, available as __cause__.
+    """
+
+
+@dataclass(slots=True)
 class ServiceCredentialsManager:
     """Service credentials manager with caching and expiry time."""
 
     aws_access_key_id: str
     aws_secret_access_key: str
     session_token: str
-    expiry: float
+    expiry: float  # Wall-clock expiration timestamp, as returned by STS
+    # Credentials are treated as expired this many seconds early, so callers
+    # never receive credentials about to be refused by AWS
+    expiry_skew_seconds: float = 60.0
+    # Expiry on the monotonic clock, unaffected by system clock adjustments
+    _deadline: float = field(init=False, repr=False, compare=False)
+    # API response, built once as it is served on every cache hit
+    _payload: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._deadline = time.monotonic() + (self.expiry - time.time())
+        expiration_iso = datetime.fromtimestamp(self.expiry, tz=timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S.%fZ"
+        )
+        self._payload = {
+            "AccessKeyId": self.aws_access_key_id,
+            "SecretAccessKey": self.aws_secret_access_key,
+            "Token": self.session_token,
+            "Expiration": expiration_iso,
+        }
 
     def is_expired(self) -> bool:
-        """Check if credentials are expired."""
-        return time.time() > self.expiry
+        """Check if credentials are expired or within the expiry skew window."""
+        return time.monotonic() + self.expiry_skew_seconds >= self._deadline
 
     def get_sensitive_values(self) -> list[str]:
         """Get list of sensitive values that should be sanitized.
@@ -44,18 +78,11 @@ class ServiceCredentialsManager:
         ]
 
     def to_dict(self) -> dict:
-        """Convert to dictionary format for API response."""
-        from datetime import datetime, timezone
+        """Convert to dictionary format for API response.
 
-        expiration_iso = datetime.fromtimestamp(self.expiry, tz=timezone.utc).strftime(
-            "%Y-%m-%dT%H:%M:%S.%fZ"
-        )
-        return {
-            "AccessKeyId": self.aws_access_key_id,
-            "SecretAccessKey": self.aws_secret_access_key,
-            "Token": self.session_token,
-            "Expiration": expiration_iso,
-        }
+        The same dict is returned on every call and must not be modified.
+        """
+        return self._payload
 
 
 class CredentialsHandler:
@@ -65,6 +92,18 @@ class CredentialsHandler:
         self.config = config
         self.cache: dict[str, ServiceCredentialsManager] = {}
         self._cache_lock = threading.RLock()
+        # STS clients shared by every service using the same source credentials
+        self._sts_clients: dict[tuple, Any] = {}
+        self._sts_clients_lock = threading.Lock()
+        # Per-service locks so concurrent cache misses share a single AssumeRole
+        self._refresh_locks: dict[str, threading.Lock] = {}
+        # Last refresh failure per service, with the service config it was
+        # obtained with, replayed for credentials.retry_delay
+        self._errors: dict[str, tuple[float, ServiceConfig | None, Exception]] = {}
+        # Per service config object: resolved AWS client config and AssumeRole
+        # parameters, see _memoized
+        self._aws_configs: dict[int, tuple[ServiceConfig, dict]] = {}
+        self._assume_role_params: dict[int, tuple[ServiceConfig, dict]] = {}
         self._cleanup_thread: threading.Thread | None = None
         self._stop_cleanup = threading.Event()
         self._start_cache_cleanup()
@@ -80,22 +119,16 @@ class CredentialsHandler:
                     if self._stop_cleanup.wait(timeout=60):
                         break
 
-                    # Clean up expired entries
+                    # Clean up expired entries, and those of removed services
                     with self._cache_lock:
                         expired_services = [
                             service_name
                             for service_name, creds in self.cache.items()
                             if creds.is_expired()
+                            or service_name not in self.config.services
                         ]
                         for service_name in expired_services:
-                            # Unregister sensitive values before removing from cache
-                            from credproxy.sanitizer import unregister_sensitive_value
-
-                            creds = self.cache[service_name]
-                            for value in creds.get_sensitive_values():
-                                unregister_sensitive_value(value)
-
-                            del self.cache[service_name]
+                            self._evict(service_name)
                             LOG.debug(
                                 "Removed expired credentials from cache: %s",
                                 service_name,
@@ -106,6 +139,7 @@ class CredentialsHandler:
                                 "Cache cleanup: removed %d expired credential entries",
                                 len(expired_services),
                             )
+                        self._forget_removed_services()
                 except Exception as error:
                     LOG.error("Error during cache cleanup")
                     LOG.exception(error)
@@ -116,6 +150,42 @@ class CredentialsHandler:
         self._cleanup_thread.start()
         LOG.debug("Started background cache cleanup thread")
 
+    def _evict(self, service_name: str) -> None:
+        """Remove a cache entry and unregister its sensitive values.
+
+        Must be called with the cache lock held.
+        """
+        from credproxy.sanitizer import unregister_sensitive_value
+
+        creds = self.cache.pop(service_name)
+        for value in creds.get_sensitive_values():
+            unregister_sensitive_value(value)
+
+    def _forget_removed_services(self) -> None:
+        """Drop refresh locks and failures of services no longer configured.
+
+        Must be called with the cache lock held.
+        """
+        for service_name in list(self._refresh_locks):
+            if service_name not in self.config.services:
+                del self._refresh_locks[service_name]
+        for service_name in list(self._errors):
+            if service_name not in self.config.services:
+                self._errors.pop(service_name, None)
+
+    def _store_credentials(
+        self, service_name: str, service_creds: ServiceCredentialsManager
+    ) -> None:
+        """Cache credentials for a service, evicting the oldest beyond the bound."""
+        with self._cache_lock:
+            # Re-insert so the cache stays ordered from oldest to newest refresh
+            self.cache.pop(service_name, None)
+            self.cache[service_name] = service_creds
+            while len(self.cache) > _CACHE_MAXSIZE:
+                oldest = next(iter(self.cache))
+                self._evict(oldest)
+                LOG.debug("Evicted credentials from full cache: %s", oldest)
+
     def cleanup(self) -> None:
         """Clean up resources during graceful shutdown."""
         # Stop the cleanup thread
@@ -143,23 +213,124 @@ class CredentialsHandler:
                 LOG.info("Credential cache cleared successfully")
             else:
                 LOG.info("No cached credentials to clean up")
+            self._refresh_locks.clear()
+            self._errors.clear()
+
+        with self._sts_clients_lock:
+            self._sts_clients.clear()
+        self._aws_configs.clear()
+        self._assume_role_params.clear()
+
+    def _get_cached_credentials(self, service_name: str) -> dict | None:
+        """Return the cached credentials for a service, or None if missing/expired."""
+        with self._cache_lock:
+            cached = self.cache.get(service_name)
+            if cached is not None and not cached.is_expired():
+                LOG.debug("Using cached credentials for %s", service_name)
+                return cached.to_dict()
+        return None
 
     def get_credentials(self, service_name: str) -> dict:
-        """Get credentials for a service, using cache if not expired."""
+        """Get credentials for a service, using cache if not expired.
+
+        Concurrent cache misses for the same service are coalesced: one caller
+        assumes the role while the others wait and then reuse its result. A
+        failed refresh is replayed as a RefreshBackoffError without calling
+        STS again until credentials.retry_delay has elapsed, so a throttled or
+        misconfigured service does not hit STS on every request. Replacing the
+        service config, e.g. through the file watcher, ends the replay.
+        """
+        # Check cache first
+        credentials = self._get_cached_credentials(service_name)
+        if credentials is not None:
+            return credentials
+
         with self._cache_lock:
-            # Check cache first
-            if service_name in self.cache:
-                cached = self.cache[service_name]
-                if not cached.is_expired():
-                    LOG.debug("Using cached credentials for %s", service_name)
-                    return cached.to_dict()
-                else:
-                    # Cache expired
-                    pass
-            else:
-                # Not in cache
-                pass
+            refresh_lock = self._refresh_locks.setdefault(
+                service_name, threading.Lock()
+            )
+
+        with refresh_lock:
+            # Another caller may have refreshed the cache while we waited
+            credentials = self._get_cached_credentials(service_name)
+            if credentials is not None:
+                return credentials
+
+            service_config = self.config.services.get(service_name)
+            failure = self._errors.get(service_name)
+            if failure is not None:
+                failed_at, failed_config, error = failure
+                if (
+                    failed_config is service_config
+                    and time.monotonic() - failed_at
+                    < self.config.credentials.retry_delay
+                ):
+                    LOG.debug("Replaying recent refresh error for %s", service_name)
+                    # A new exception per caller: the cached one is shared
+                    # between threads and must not have its traceback rewritten
+                    raise RefreshBackoffError(
+                        f"Credentials refresh for {service_name} failed recently: "
+                        f"{error}"
+                    ) from error
+
+            try:
+                credentials = self._refresh_credentials(service_name)
+            except Exception as error:
+                self._errors[service_name] = (time.monotonic(), service_config, error)
+                raise
+            self._errors.pop(service_name, None)
+            return credentials
+
+    async def aget_credentials(self, service_name: str) -> dict:
+        """Async variant of get_credentials for use from an event loop.
+
+        Cache hits are served directly. Misses run get_credentials in a worker
+        thread, so the STS call does not block the loop and concurrent misses
+        share the same single-flight refresh as synchronous callers.
+        """
+        credentials = self._get_cached_credentials(service_name)
+        if credentials is not None:
+            return credentials
+        return await asyncio.to_thread(self.get_credentials, service_name)
+
+    def prefetch_all(self, max_workers: int = 10) -> int:
+        """Fill the cache for every configured service in parallel.
 
+        AssumeRole calls are I/O bound, so fanning them out over a thread pool
+        warms N services in roughly N / max_workers STS round-trips instead of
+        N. Failures are logged and do not stop the other services.
+
+        Returns:
+            Number of services with credentials in the cache afterwards
+        """
+        service_names = list(self.config.services)
+        if not service_names:
+            return 0
+
+        def prefetch(service_name: str) -> bool:
+            try:
+                self.get_credentials(service_name)
+                return True
+            except Exception as error:
+                LOG.error("Failed to prefetch credentials for %s", service_name)
+                LOG.exception(error)
+                return False
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(service_names)),
+            thread_name_prefix="credentials-prefetch",
+        ) as executor:
+            prefetched = sum(executor.map(prefetch, service_names))
+
+        LOG.info(
+            "Prefetched credentials for %d of %d services",
+            prefetched,
+            len(service_names),
+        )
+        return prefetched
+
+    def _refresh_credentials(self, service_name: str) -> dict:
+        """Assume the service role and cache the new credentials."""
         # Generate new credentials
         LOG.info("Generating new credentials for %s", service_name)
         service_config = self.config.services[service_name]
@@ -174,49 +345,34 @@ class CredentialsHandler:
 
         # Use the exact expiration from STS assume role API call
         expiry_time = credentials["Expiration"].timestamp()
+        # A refresh buffer as long as the session (refresh_buffer_seconds can
+        # exceed DurationSeconds) would make credentials expired on arrival:
+        # keep at least half of their lifetime usable
+        expiry_skew_seconds = min(
+            self.config.credentials.refresh_buffer_seconds,
+            (expiry_time - time.time()) / 2,
+        )
         service_creds = ServiceCredentialsManager(
             aws_access_key_id=credentials["AccessKeyId"],
             aws_secret_access_key=credentials["SecretAccessKey"],
             session_token=credentials["SessionToken"],
             expiry=expiry_time,
+            expiry_skew_seconds=expiry_skew_seconds,
         )
 
-        with self._cache_lock:
-            self.cache[service_name] = service_creds
+        self._store_credentials(service_name, service_creds)
         return service_creds.to_dict()
 
     def _assume_role(self, service_config: ServiceConfig) -> dict:
         """Assume role for service and return credentials."""
-        # Get service name for metrics
-        service_name = next(
-            (
-                name
-                for name, config in self.config.services.items()
-                if config == service_config
-            ),
-            "unknown",
-        )
-
         try:
-            # Get AWS config for this service
-            aws_config = self._get_aws_config(service_config)
-
-            # Create STS client with profile if specified
-            profile_name = aws_config.pop("profile_name", None)
-            if profile_name:
-                session = boto3.Session(profile_name=profile_name)
-                sts_client = session.client("sts", **aws_config)
-            else:
-                sts_client = boto3.client("sts", **aws_config)
-
-            # Convert dataclass to dict and filter out None values for boto3 API call
-            assumed_role_dict = asdict(service_config.assumed_role)
-            assume_role_params = {
-                k: v for k, v in assumed_role_dict.items() if v is not None
-            }
+            # Reuse the STS client for this service's source credentials
+            sts_client = self._get_sts_client(self._get_aws_config(service_config))
 
             # Assume role
-            response = sts_client.assume_role(**assume_role_params)
+            response = sts_client.assume_role(
+                **self._get_assume_role_params(service_config)
+            )
 
             # AWS operation successful - no detailed metrics needed
 
@@ -225,10 +381,94 @@ class CredentialsHandler:
         except ClientError as error:
             # AWS operation failed - no detailed metrics needed
 
+            # Service name is only needed for the log, resolve it on failure
+            service_name = next(
+                (
+                    name
+                    for name, config in list(self.config.services.items())
+                    if config is service_config
+                ),
+                "unknown",
+            )
             LOG.error("Failed to assume role for %s: %s", service_name, str(error))
             raise
 
+    def _get_sts_client(self, aws_config: dict) -> Any:
+        """Get the STS client for the given AWS config, creating it on first use.
+
+        Building a boto3 client loads and parses the service model, so clients
+        are kept per distinct source credentials and reused across services
+        and refreshes. boto3 clients are thread-safe once created.
+        """
+        client_key = tuple(sorted(aws_config.items()))
+        with self._sts_clients_lock:
+            sts_client = self._sts_clients.get(client_key)
+            if sts_client is None:
+                # Deferred import: boto3 is the heaviest import of the application
+                import boto3
+
+                # Create STS client with profile if specified
+                client_kwargs = dict(aws_config)
+                profile_name = client_kwargs.pop("profile_name", None)
+                if profile_name:
+                    session = boto3.Session(profile_name=profile_name)
+                    sts_client = session.client("sts", **client_kwargs)
+                else:
+                    sts_client = boto3.client("sts", **client_kwargs)
+                self._sts_clients[client_key] = sts_client
+            return sts_client
+
+    def _memoized(
+        self,
+        memo: dict[int, tuple[ServiceConfig, dict]],
+        service_config: ServiceConfig,
+        compute: Callable[[ServiceConfig], dict],
+    ) -> dict:
+        """Return compute(service_config), cached in memo per service config.
+
+        Service configs are replaced rather than modified when a service is
+        updated, so results are cached against the config object itself. The
+        returned dict is shared and must not be modified by callers.
+        """
+        cached = memo.get(id(service_config))
+        # Identity check: ids of released service configs can be reused
+        if cached is not None and cached[0] is service_config:
+            return cached[1]
+
+        value = compute(service_config)
+        with self._cache_lock:
+            if len(memo) >= len(self.config.services):
+                # Drop entries for services that are no longer configured
+                current = {
+                    id(service) for service in list(self.config.services.values())
+                }
+                for key in [key for key in memo if key not in current]:
+                    del memo[key]
+            memo[id(service_config)] = (service_config, value)
+        return value
+
+    def _get_assume_role_params(self, service_config: ServiceConfig) -> dict:
+        """Get the AssumeRole API parameters for a service, memoized."""
+        return self._memoized(
+            self._assume_role_params,
+            service_config,
+            self._compute_assume_role_params,
+        )
+
+    @staticmethod
+    def _compute_assume_role_params(service_config: ServiceConfig) -> dict:
+        """Build the AssumeRole API parameters for a service."""
+        # Convert dataclass to dict and filter out None values for boto3 API call
+        assumed_role_dict = asdict(service_config.assumed_role)
+        return {k: v for k, v in assumed_role_dict.items() if v is not None}
+
     def _get_aws_config(self, service_config: ServiceConfig) -> dict:
+        """Get AWS configuration for a service, memoized."""
+        return self._memoized(
+            self._aws_configs, service_config, self._compute_aws_config
+        )
+
+    def _compute_aws_config(self, service_config: ServiceConfig) -> dict:
         """Get AWS configuration for a service."""
         service_creds = service_config.source_credentials
         default_creds = self.config.aws_defaults
@@ -5,12 +5,14 @@
 
 from __future__ import annotations
 
+import os
 import re
 import json
-import time
+import functools
 import threading
 from typing import TYPE_CHECKING
 from pathlib import Path
+from dataclasses import dataclass
 
 
 if TYPE_CHECKING:
@@ -18,13 +20,44 @@ if TYPE_CHECKING:
 
 
 import yaml
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
-from watchdog.observers import Observer
-
-from credproxy.config import ServiceConfig
+from watchdog import utils as watchdog_utils
+from watchdog.events import (
+    FileSystemEvent,
+    FileCreatedEvent,
+    FileDeletedEvent,
+    FileModifiedEvent,
+    FileSystemEventHandler,
+)
+from watchdog.observers.polling import PollingObserver
+
+from credproxy.config import _YAML_LOADER, ServiceConfig, compile_pattern
 from credproxy.logger import LOG
 
 
+# Named UnsupportedLibc before watchdog 5
+_UNSUPPORTED_LIBC_ERROR = (
+    getattr(watchdog_utils, "UnsupportedLibcError", None)
+    or watchdog_utils.UnsupportedLibc
+)
+
+try:
+    from watchdog.observers.inotify import InotifyObserver as Observer
+except (ImportError, _UNSUPPORTED_LIBC_ERROR):
+    # Not Linux, or a libc without inotify: let watchdog pick the backend
+    from watchdog.observers import Observer
+
+# Events ServiceFileHandler acts on. Passed to the observer so that inotify
+# watches exclude the open, access and close events, e.g. our own file reads.
+_WATCHED_EVENTS = (FileCreatedEvent, FileModifiedEvent, FileDeletedEvent)
+
+# Service file formats, by lower cased file suffix
+_YAML_SUFFIXES = frozenset({".yaml", ".yml"})
+_JSON_SUFFIXES = frozenset({".json"})
+
+# Bound of the per handler cache of path filtering results
+_MATCH_CACHE_MAXSIZE = 2048
+
+
 def should_include_file(
     file_path: str, include_patterns: list[str], exclude_patterns: list[str]
 ) -> bool:
@@ -43,34 +76,117 @@ def should_include_file(
     """
     # Use full path for matching to support directory-based patterns
     # Normalize path separators for cross-platform compatibility
-    normalized_path = file_path.replace("\\", "/")
+    return _should_include(
+        file_path.replace("\\", "/"),
+        _cached_patterns(tuple(include_patterns), "include")
+        if include_patterns
+        else None,
+        _cached_patterns(tuple(exclude_patterns), "exclude"),
+    )
 
-    # Step 1: Check exclude patterns
-    for pattern in exclude_patterns:
+
+# Numbered backreferences would point at the wrong group once patterns are
+# joined into a single alternation
+_BACKREFERENCE_RE = re.compile(r"\\[1-9]")
+# Patterns of the form ".*<literal>$", e.g. ".*\\.yaml$" or ".*~$"
+_SUFFIX_PATTERN_RE = re.compile(r"\.\*((?:\\\.|[\w~-])+)\$")
+
+
+@dataclass(frozen=True, slots=True)
+class _PatternSet:
+    """Compiled include or exclude patterns of one directory."""
+
+    regexes: tuple[re.Pattern, ...]
+    # Literal suffixes when every pattern only anchors a suffix
+    suffixes: tuple[str, ...] | None = None
+
+    @property
+    def pattern(self) -> str:
+        return "|".join(regex.pattern for regex in self.regexes)
+
+    def match(self, path: str) -> bool:
+        """Whether path matches, checking literal suffixes before any regex."""
+        # "$" also matches before a trailing newline, which endswith does not
+        if self.suffixes is not None and "\n" not in path:
+            return path.endswith(self.suffixes)
+        return any(regex.match(path) for regex in self.regexes)
+
+
+def _compile_patterns(patterns: list[str], kind: str) -> _PatternSet:
+    """Compile include/exclude patterns, logging and skipping invalid ones.
+
+    Several valid patterns are joined into one alternation so matching is a
+    single regex call; the individual patterns are kept if they cannot be
+    combined (inline global flags, backreferences, duplicate group names).
+    """
+    compiled = []
+    for pattern in patterns:
         try:
-            if re.match(pattern, normalized_path):
-                LOG.debug("File %s excluded by pattern: %s", normalized_path, pattern)
-                return False
+            compiled.append(compile_pattern(pattern))
         except re.error as error:
-            LOG.warning("Invalid exclude pattern '%s': %s", pattern, error)
+            LOG.warning("Invalid %s pattern '%s': %s", kind, pattern, error)
+
+    suffixes = []
+    for regex in compiled:
+        suffix_match = _SUFFIX_PATTERN_RE.fullmatch(regex.pattern)
+        if suffix_match is None:
+            break
+        suffixes.append(suffix_match.group(1).replace("\\.", "."))
+    else:
+        if suffixes:
+            return _PatternSet(tuple(compiled), tuple(suffixes))
+
+    if len(compiled) < 2 or any(
+        _BACKREFERENCE_RE.search(regex.pattern) for regex in compiled
+    ):
+        return _PatternSet(tuple(compiled))
+    try:
+        union = compile_pattern("|".join(f"(?:{regex.pattern})" for regex in compiled))
+    except re.error:
+        return _PatternSet(tuple(compiled))
+    return _PatternSet((union,))
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_patterns(patterns: tuple[str, ...], kind: str) -> _PatternSet:
+    """Compile a pattern list once, for callers without per-directory state."""
+    return _compile_patterns(list(patterns), kind)
+
+
+def _should_include(
+    normalized_path: str,
+    include: _PatternSet | None,
+    exclude: _PatternSet,
+) -> bool:
+    """Apply compiled filters; include is None when no patterns are configured."""
+    # Step 1: Check exclude patterns
+    if exclude.match(normalized_path):
+        LOG.debug("File %s excluded by pattern: %s", normalized_path, exclude.pattern)
+        return False
 
     # Step 2: Check include patterns
-    if not include_patterns:
+    if include is None:
         LOG.debug("File %s included (no include patterns)", normalized_path)
         return True
 
-    for pattern in include_patterns:
-        try:
-            if re.match(pattern, normalized_path):
-                LOG.debug("File %s included by pattern: %s", normalized_path, pattern)
-                return True
-        except re.error as error:
-            LOG.warning("Invalid include pattern '%s': %s", pattern, error)
+    if include.match(normalized_path):
+        LOG.debug("File %s included by pattern: %s", normalized_path, include.pattern)
+        return True
 
     LOG.debug("File %s excluded (no include pattern match)", normalized_path)
     return False
 
 
+@functools.lru_cache(maxsize=4096)
+def _resolve_cached(file_path: str) -> str:
+    """Resolve a watched file path, once per path.
+
+    Cleared whenever a deletion is scheduled, as removing or replacing a file
+    can change what its path resolves to.
+    """
+    return str(Path(file_path).resolve())
+
+
 def get_directory_patterns(
     file_path: str, directories: list
 ) -> tuple[list[str], list[str]]:
@@ -106,34 +222,58 @@ def get_directory_patterns(
 class ServiceFileHandler(FileSystemEventHandler):
     """Handle file system events for service configuration files."""
 
-    def __init__(self, config: Config, reload_interval: int):
+    def __init__(
+        self,
+        config: Config,
+        reload_interval: float,
+        processed_event: threading.Event | None = None,
+    ):
         self.config = config
         self.reload_interval = reload_interval
-        self._pending_changes: dict[str, float] = {}
-        self._debounce_timer: threading.Timer | None = None
+        # Changed paths, mapped to the sequence number of their latest event
+        self._pending_changes: dict[str, int] = {}
+        self._seq = 0
         self._lock = threading.Lock()
+        # Single thread processing the accumulated changes, woken through
+        # _flush_event when the first change of a burst is queued
+        self._drain_thread: threading.Thread | None = None
+        self._stop_drain = threading.Event()
+        self._flush_event = threading.Event()
+        # Set by stop_drain: events still dispatched afterwards must not
+        # start a new drain thread
+        self._stopping = False
+        # Compiled include/exclude patterns keyed by resolved directory path,
+        # built on first use from config.dynamic_services.directories
+        self._include_re: dict[str, _PatternSet | None] = {}
+        self._exclude_re: dict[str, _PatternSet] = {}
+        self._patterns_compiled = False
+        # Filtering results by event path, oldest first, see _matches_pattern
+        self._match_cache: dict[str, bool] = {}
+        # Set once a batch of changes has been processed; lets callers wait on
+        # the watcher instead of sleeping past the reload interval.
+        self.processed_event = processed_event or threading.Event()
 
     def on_created(self, event: FileSystemEvent) -> None:
         """Handle file creation events."""
         if not event.is_directory and self._matches_pattern(event.src_path):
-            absolute_path = Path(event.src_path).resolve()
+            absolute_path = _resolve_cached(event.src_path)
             LOG.info(
                 "File watcher detected new file: %s (event: created, absolute: %s)",
                 event.src_path,
                 absolute_path,
             )
-            self._schedule_reload(str(absolute_path), "created")
+            self._schedule_reload(absolute_path, "created")
 
     def on_modified(self, event: FileSystemEvent) -> None:
         """Handle file modification events."""
         if not event.is_directory and self._matches_pattern(event.src_path):
-            absolute_path = Path(event.src_path).resolve()
+            absolute_path = _resolve_cached(event.src_path)
             LOG.info(
                 "File watcher detected file change: %s (event: modified, absolute: %s)",
                 event.src_path,
                 absolute_path,
             )
-            self._schedule_reload(str(absolute_path), "modified")
+            self._schedule_reload(absolute_path, "modified")
 
     def on_deleted(self, event: FileSystemEvent) -> None:
         """Handle file deletion events."""
@@ -149,37 +289,124 @@ class ServiceFileHandler(FileSystemEventHandler):
         if not self.config.dynamic_services:
             return False
 
-        include_patterns, exclude_patterns = get_directory_patterns(
-            file_path, self.config.dynamic_services.directories
-        )
+        cached = self._match_cache.get(file_path)
+        if cached is not None:
+            return cached
+
+        if not self._patterns_compiled:
+            self._compile_directory_patterns()
 
-        return should_include_file(file_path, include_patterns, exclude_patterns)
+        normalized_file_path = _resolve_cached(file_path).replace("\\", "/")
+        # Same lookup as get_directory_patterns: first directory containing it
+        for directory_path, include in self._include_re.items():
+            if normalized_file_path.startswith(directory_path):
+                exclude = self._exclude_re[directory_path]
+                break
+        else:
+            # No matching directory found, include all
+            include, exclude = None, _cached_patterns((), "exclude")
+
+        matches = _should_include(file_path.replace("\\", "/"), include, exclude)
+        self._match_cache[file_path] = matches
+        if len(self._match_cache) > _MATCH_CACHE_MAXSIZE:
+            # Evict the oldest entry
+            self._match_cache.pop(next(iter(self._match_cache)))
+        return matches
+
+    def _compile_directory_patterns(self) -> None:
+        """Compile each monitored directory's patterns once."""
+        from credproxy.config import DirectoryConfig
+
+        for directory_config in self.config.dynamic_services.directories:
+            if not isinstance(directory_config, DirectoryConfig):
+                continue
+            directory_path = str(Path(directory_config.path).resolve()).replace(
+                "\\", "/"
+            )
+            if directory_path in self._include_re:
+                continue
+            self._include_re[directory_path] = (
+                _compile_patterns(directory_config.include_patterns, "include")
+                if directory_config.include_patterns
+                else None
+            )
+            self._exclude_re[directory_path] = _compile_patterns(
+                directory_config.exclude_patterns, "exclude"
+            )
+        self._match_cache.clear()
+        self._patterns_compiled = True
 
     def _schedule_reload(self, file_path: str, event_type: str) -> None:
-        """Schedule a reload with debouncing.
+        """Queue a file change for the drain thread.
 
-        Uses a separate lock strategy to prevent potential deadlock between
-        timer cancellation and callback execution.
+        Changes arriving within one reload interval of the first one are
+        coalesced and processed in a single pass, instead of re-arming a timer
+        on every event.
         """
-        # Cancel timer outside of lock to prevent deadlock
-        timer_to_cancel = None
+        if event_type == "deleted":
+            # Results below depend on what the path resolves to
+            _resolve_cached.cache_clear()
+            self._match_cache.clear()
+
         with self._lock:
-            self._pending_changes[file_path] = time.time()
-            timer_to_cancel = self._debounce_timer
-            self._debounce_timer = None
+            self._seq += 1
+            self._pending_changes[file_path] = self._seq
 
-        # Cancel old timer outside of lock
-        if timer_to_cancel:
-            timer_to_cancel.cancel()
+        self._flush_event.set()
+        self.start_drain()
+        LOG.debug("Scheduled reload for %s (event: %s)", file_path, event_type)
 
-        # Create and start new timer
+    def start_drain(self) -> None:
+        """Start the thread processing pending changes, unless already running.
+
+        Does nothing once stop_drain has been called.
+        """
         with self._lock:
-            self._debounce_timer = threading.Timer(
-                self.reload_interval, self._process_pending_changes
+            if self._stopping:
+                return
+            if self._drain_thread is not None and self._drain_thread.is_alive():
+                return
+
+            self._stop_drain = threading.Event()
+            self._drain_thread = threading.Thread(
+                target=self._drain_loop,
+                args=(self._stop_drain,),
+                daemon=True,
+                name="file-watcher-drain",
             )
-            self._debounce_timer.start()
+            self._drain_thread.start()
+        LOG.debug("Started file watcher drain thread")
+
+    def stop_drain(self, timeout: float = 5) -> None:
+        """Stop the drain thread for good; changes not yet processed stay pending."""
+        with self._lock:
+            self._stopping = True
+            drain_thread, self._drain_thread = self._drain_thread, None
+            self._stop_drain.set()
+            # Wake the thread if it is idle
+            self._flush_event.set()
+
+        if drain_thread is not None:
+            drain_thread.join(timeout=timeout)
+            LOG.debug("Stopped file watcher drain thread")
 
-            LOG.debug("Scheduled reload for %s (event: %s)", file_path, event_type)
+    def _drain_loop(self, stop: threading.Event) -> None:
+        """Process queued changes one reload interval after the first of a burst.
+
+        Sleeps without timeout while nothing is pending.
+        """
+        while True:
+            self._flush_event.wait()
+            # Let the rest of the burst accumulate before processing it
+            if stop.is_set() or stop.wait(timeout=self.reload_interval):
+                return
+            # Cleared before the swap: changes queued after it wake the next pass
+            self._flush_event.clear()
+            try:
+                self._process_pending_changes()
+            except Exception as error:
+                LOG.error("Error processing pending file changes")
+                LOG.exception(error)
 
     def _process_pending_changes(self) -> None:
         """Process all pending file changes."""
@@ -187,15 +414,17 @@ class ServiceFileHandler(FileSystemEventHandler):
             if not self._pending_changes:
                 return
 
-            pending = self._pending_changes.copy()
-            self._pending_changes.clear()
+            # Swap in a fresh dict so the lock is only held for the exchange
+            pending, self._pending_changes = self._pending_changes, {}
 
-        for file_path, timestamp in pending.items():
+        for file_path in pending:
             try:
                 self._process_file_change(file_path)
             except Exception as error:
                 LOG.error("Failed to process file change for %s: %s", file_path, error)
 
+        self.processed_event.set()
+
     def _process_file_change(self, file_path: str) -> None:
         """Process a single file change."""
         path = Path(file_path)
@@ -228,7 +457,7 @@ class ServiceFileHandler(FileSystemEventHandler):
                 if service_name in self.config.services:
                     existing_service = self.config.services[service_name]
                     existing_source = existing_service.source_file
-                    new_source = str(Path(file_path).resolve())
+                    new_source = _resolve_cached(file_path)
 
                     # Only allow update if it's the same file being modified
                     if existing_source == new_source:
@@ -272,14 +501,25 @@ class ServiceFileHandler(FileSystemEventHandler):
 
         try:
             LOG.info("Loading service configuration file: %s", file_path)
-            with open(path, encoding="utf-8") as f:
-                if path.suffix.lower() in [".yaml", ".yml"]:
-                    data = yaml.safe_load(f)
-                elif path.suffix.lower() == ".json":
-                    data = json.load(f)
-                else:
-                    LOG.warning("Unsupported file format for %s, skipping", file_path)
-                    return None
+            suffix = path.suffix.lower()
+            if suffix not in _YAML_SUFFIXES and suffix not in _JSON_SUFFIXES:
+                LOG.warning("Unsupported file format for %s, skipping", file_path)
+                return None
+
+            # Read as bytes, like the main configuration: libyaml then parses
+            # the buffer directly instead of going through a file reader wrapper
+            raw_content = path.read_bytes()
+
+            # A file that never mentions the key cannot define any service:
+            # reject it without parsing
+            if b"services" not in raw_content:
+                LOG.error("No 'services' key found in %s, ignoring file", file_path)
+                return None
+
+            if suffix in _YAML_SUFFIXES:
+                data = yaml.load(raw_content, Loader=_YAML_LOADER)
+            else:
+                data = json.loads(raw_content)
 
             if not isinstance(data, dict):
                 LOG.error(
@@ -361,9 +601,8 @@ class ServiceFileHandler(FileSystemEventHandler):
                     merged_source_creds_data
                 ),
                 assumed_role=self.config._create_assumed_role_config(assumed_role_data),
-                source_file=str(
-                    Path(file_path).resolve()
-                ),  # Track which file loaded this service
+                # Track which file loaded this service
+                source_file=_resolve_cached(file_path),
             )
             LOG.info("Successfully created service configuration for %s", service_name)
             return service_name, service_config
@@ -381,6 +620,9 @@ class FileWatcherService:
         self.config = config
         self.observer: Observer | None = None
         self.handler: ServiceFileHandler | None = None
+        # Set after each batch of file changes is processed, see
+        # ServiceFileHandler.processed_event
+        self.processed_event = threading.Event()
         self._running = False
 
     def start(self) -> None:
@@ -398,9 +640,15 @@ class FileWatcherService:
             self.handler = ServiceFileHandler(
                 config=self.config,
                 reload_interval=self.config.dynamic_services.reload_interval,
+                processed_event=self.processed_event,
             )
 
             self.observer = Observer()
+            if isinstance(self.observer, PollingObserver):
+                LOG.warning(
+                    "No native file system events available, "
+                    "polling the dynamic services directories"
+                )
             if self.observer and self.handler:
                 # Create observers for each directory
                 for directory_config in self.config.dynamic_services.directories:
@@ -410,11 +658,15 @@ class FileWatcherService:
                         directory.mkdir(parents=True, exist_ok=True)
 
                     self.observer.schedule(
-                        self.handler, str(directory), recursive=False
+                        self.handler,
+                        str(directory),
+                        recursive=False,
+                        event_filter=_WATCHED_EVENTS,
                     )
                     LOG.info("Added directory to watcher: %s", directory.resolve())
 
                 self.observer.start()
+                self.handler.start_drain()
             self._running = True
 
             LOG.info(
@@ -435,23 +687,24 @@ class FileWatcherService:
             return
 
         try:
-            if self.handler and self.handler._debounce_timer:
-                self.handler._debounce_timer.cancel()
-
+            # Use configurable timeout with safe fallback
+            timeout = 5  # Default timeout
+            if (
+                self.config.dynamic_services
+                and hasattr(self.config.dynamic_services, "watcher_stop_timeout")
+                and isinstance(self.config.dynamic_services.watcher_stop_timeout, int)
+            ):
+                timeout = self.config.dynamic_services.watcher_stop_timeout
+
+            # Stop the observer first so no event reaches the handler while
+            # its drain thread is being stopped
             if self.observer:
-                # Use configurable timeout with safe fallback
-                timeout = 5  # Default timeout
-                if (
-                    self.config.dynamic_services
-                    and hasattr(self.config.dynamic_services, "watcher_stop_timeout")
-                    and isinstance(
-                        self.config.dynamic_services.watcher_stop_timeout, int
-                    )
-                ):
-                    timeout = self.config.dynamic_services.watcher_stop_timeout
                 self.observer.stop()
                 self.observer.join(timeout=timeout)
 
+            if self.handler:
+                self.handler.stop_drain(timeout=timeout)
+
             self._running = False
             LOG.info("Stopped file watcher service")
 
@@ -474,22 +727,31 @@ class FileWatcherService:
                     continue
 
                 directory_file_count = 0
-                # Scan all files in directory and apply filtering
-                for file_path in directory.iterdir():
-                    if file_path.is_file():
+                include = (
+                    _compile_patterns(directory_config.include_patterns, "include")
+                    if directory_config.include_patterns
+                    else None
+                )
+                exclude = _compile_patterns(
+                    directory_config.exclude_patterns, "exclude"
+                )
+                # Scan all files in directory and apply filtering; scandir
+                # entries carry their file type, saving a stat per entry
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not entry.is_file():
+                            continue
                         # Apply filtering logic using per-directory patterns
-                        if should_include_file(
-                            str(file_path),
-                            directory_config.include_patterns,
-                            directory_config.exclude_patterns,
+                        if _should_include(
+                            entry.path.replace("\\", "/"), include, exclude
                         ):
                             directory_file_count += 1
                             total_file_count += 1
-                            LOG.info("Loading existing service file: %s", file_path)
+                            LOG.info("Loading existing service file: %s", entry.path)
                             if self.handler:
-                                self.handler._process_file_change(str(file_path))
+                                self.handler._process_file_change(entry.path)
                         else:
-                            LOG.debug("Skipping file %s (filtered out)", file_path)
+                            LOG.debug("Skipping file %s (filtered out)", entry.path)
 
                 LOG.info(
                     "Loaded %d service files from %s", directory_file_count, directory
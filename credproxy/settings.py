@@ -11,18 +11,33 @@ and avoid duplication throughout the codebase.
 from __future__ import annotations
 
 import os
+import functools
 from pathlib import Path
 
 
+_VALID_LOG_LEVELS = frozenset({"debug", "info", "warning", "error", "critical"})
+_TRUTHY_VALUES = frozenset({"true", "1", "yes", "on"})
+
+
 def get_credproxy_namespace() -> str:
     return os.environ.get("CREDPROXY_NAMESPACE", "CREDPROXY_")
 
 
+@functools.lru_cache(maxsize=4)
+def _resolve_config_path(config_file: str) -> str:
+    """Resolve the config file path once per distinct value.
+
+    The cache only resets on process restart: symlinks changed afterwards are
+    not followed again, which is fine as settings are read once at startup.
+    """
+    return str(Path(config_file).resolve())
+
+
 def get_config_file(namespace: str) -> str:
     default_path = "/credproxy/config.yaml"
     config_file = os.environ.get(f"{namespace}CONFIG_FILE", default_path)
     # Always return absolute path
-    return str(Path(config_file).resolve())
+    return _resolve_config_path(config_file)
 
 
 def get_from_env_tag(namespace: str) -> str:
@@ -39,9 +54,8 @@ def get_tag_separator(namespace: str) -> str:
 
 def _validate_log_level(log_level: str):
     """Validate log level, accepting case-insensitive values with fallback."""
-    valid_levels = {"debug", "info", "warning", "error", "critical"}
     normalized_level = log_level.lower().strip()
-    return normalized_level if normalized_level in valid_levels else "warning"
+    return normalized_level if normalized_level in _VALID_LOG_LEVELS else "warning"
 
 
 def get_log_level(namespace: str) -> str:
@@ -53,7 +67,13 @@ def get_log_level(namespace: str) -> str:
 def get_log_health_checks(namespace: str) -> bool:
     """Get health check logging setting from environment."""
     raw_value = os.environ.get(f"{namespace}LOG_HEALTH_CHECKS", "").lower().strip()
-    return raw_value in {"true", "1", "yes", "on"}
+    return raw_value in _TRUTHY_VALUES
+
+
+def get_config_json_cache(namespace: str) -> bool:
+    """Get whether parsed YAML configuration is cached in a JSON sidecar file."""
+    raw_value = os.environ.get(f"{namespace}CONFIG_JSON_CACHE", "").lower().strip()
+    return raw_value in _TRUTHY_VALUES
 
 
 NAMESPACE = get_credproxy_namespace()
@@ -40,25 +40,60 @@ def substitute_variables(value: Any) -> Any:
         value: The value to substitute variables in
 
     Returns:
-        The value with variables substituted
+        The value with variables substituted. Values without any variable are
+        returned as-is, without being copied.
     """
+    if not _needs_substitution(value):
+        return value
+    # Resolved variables of this pass only: files are read once per load, and
+    # their contents are not kept once the configuration is built
+    return _substitute(value, {})
+
+
+def _substitute(value: Any, resolved: dict[tuple[str, str], str]) -> Any:
+    """Substitute variables in a value, rebuilding only the changed containers."""
+    # Local binding keeps the recursive calls off the module globals lookup
+    substitute = _substitute
     if isinstance(value, str):
-        return _substitute_string(value)
+        return _substitute_string(value, resolved=resolved)
     elif isinstance(value, dict):
-        return {key: substitute_variables(val) for key, val in value.items()}
+        substituted = {key: substitute(val, resolved) for key, val in value.items()}
+        if all(new is old for new, old in zip(substituted.values(), value.values())):
+            return value
+        return substituted
     elif isinstance(value, list):
-        return [substitute_variables(item) for item in value]
+        substituted = [substitute(item, resolved) for item in value]
+        if all(new is old for new, old in zip(substituted, value)):
+            return value
+        return substituted
     else:
         return value
 
 
-def _substitute_string(value: str, depth: int = 0, max_depth: int = 10) -> str:
+def _needs_substitution(value: Any) -> bool:
+    """Check whether a value, or any nested value, contains a variable."""
+    if isinstance(value, str):
+        return "${" in value
+    elif isinstance(value, dict):
+        return any(_needs_substitution(val) for val in value.values())
+    elif isinstance(value, list):
+        return any(_needs_substitution(item) for item in value)
+    return False
+
+
+def _substitute_string(
+    value: str,
+    depth: int = 0,
+    max_depth: int = 10,
+    resolved: dict[tuple[str, str], str] | None = None,
+) -> str:
     """Substitute variables in a string with recursion depth limit.
 
     Args:
         value: The string value to substitute
         depth: Current recursion depth (default: 0)
         max_depth: Maximum allowed recursion depth (default: 10)
+        resolved: Variables already resolved during the current pass
 
     Returns:
         String with variables substituted
@@ -72,18 +107,25 @@ def _substitute_string(value: str, depth: int = 0, max_depth: int = 10) -> str:
             f"Check for circular references in configuration."
         )
 
+    # Plain strings, such as most substituted values, skip the regex pass
+    if "${" not in value:
+        return value
+
+    if resolved is None:
+        resolved = {}
+
     def replace_match(match):
         var_type, var_value = match.groups()
 
-        if var_type == FROM_ENV_TAG:
-            substituted = _substitute_env(var_value)
-        elif var_type == FROM_FILE_TAG:
-            substituted = _substitute_file(var_value)
-        else:
-            raise ValueError(f"Unknown variable type: {var_type}")
+        substituted = resolved.get((var_type, var_value))
+        if substituted is None:
+            resolver = _RESOLVERS.get(var_type)
+            if resolver is None:
+                raise ValueError(f"Unknown variable type: {var_type}")
+            substituted = resolved[var_type, var_value] = resolver(var_value)
 
         # Recursively substitute variables in the result with incremented depth
-        return _substitute_string(substituted, depth + 1, max_depth)
+        return _substitute_string(substituted, depth + 1, max_depth, resolved)
 
     return VARIABLE_PATTERN.sub(replace_match, value)
 
@@ -103,20 +145,36 @@ def _substitute_file(file_path: str) -> str:
         raise ValueError(f"File '{file_path}' not found")
 
     try:
-        content = path.read_text()
-
-        # Check if content is effectively a single line with just trailing newline
-        if content.endswith("\n"):
-            # Remove trailing newline and check if there are any other newlines
-            content_without_trailing_newline = content[:-1]
-            if "\n" not in content_without_trailing_newline:
-                # Single line with trailing newline - remove the trailing newline
-                return content_without_trailing_newline
-            else:
-                # Multiple lines - preserve all newlines including the trailing one
-                return content
-        else:
-            # No trailing newline - return as-is
-            return content
+        return _read_file(path)
     except Exception as error:
         raise ValueError(f"Error reading file '{file_path}': {error}")
+
+
+def _read_file(path: Path) -> str:
+    """Read a substituted file.
+
+    Not cached across loads: these are usually secrets, possibly rotated in
+    place, so every configuration load reads the current contents.
+    """
+    content = path.read_text()
+
+    # Check if content is effectively a single line with just trailing newline
+    if content.endswith("\n"):
+        # Remove trailing newline and check if there are any other newlines
+        content_without_trailing_newline = content[:-1]
+        if "\n" not in content_without_trailing_newline:
+            # Single line with trailing newline - remove the trailing newline
+            return content_without_trailing_newline
+        else:
+            # Multiple lines - preserve all newlines including the trailing one
+            return content
+    else:
+        # No trailing newline - return as-is
+        return content
+
+
+# Resolver for each substitution tag, looked up once per variable
+_RESOLVERS = {
+    FROM_ENV_TAG: _substitute_env,
+    FROM_FILE_TAG: _substitute_file,
+}
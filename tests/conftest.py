@@ -0,0 +1,62 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""Shared pytest fixtures for the CredProxy test suite."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+import pytest
+
+from credproxy.app import init_app
+from credproxy.config import Config
+
+
+def pytest_collection_modifyitems(items):
+    """Keep the file watcher tests, which run real observers, on one worker.
+
+    Only effective with pytest-xdist and --dist loadgroup.
+    """
+    for item in items:
+        if "file_watcher" in item.nodeid:
+            item.add_marker(pytest.mark.xdist_group("file_watcher"))
+
+
+@pytest.fixture(scope="session")
+def build_app():
+    """Factory building Flask apps with the file watcher service mocked out.
+
+    Apps are built at most once per test session (per worker when the suite
+    is distributed) and their background services are stopped at teardown.
+    """
+    apps = []
+
+    def _build(config):
+        with patch("credproxy.app.FileWatcherService", autospec=True):
+            app = init_app(config)
+        apps.append(app)
+        return app
+
+    yield _build
+
+    for app in apps:
+        app.config["file_watcher"].stop()
+        app.config["credentials_handler"].cleanup()
+
+
+@pytest.fixture(scope="session")
+def base_app(build_app):
+    """Flask app built once from the default configuration."""
+    return build_app(Config())
+
+
+@pytest.fixture(scope="session")
+def client(base_app):
+    """Test client for the shared default app.
+
+    Not entered as a context manager: that would keep the last request
+    context pushed across tests.
+    """
+    return base_app.test_client()
@@ -5,9 +5,32 @@
 
 from __future__ import annotations
 
+import os
 import random
 import string
-from typing import Any
+import functools
+from typing import Any, ClassVar
+
+
+def _translate_table(alphabet: str) -> bytes:
+    """Build a ``bytes.translate`` table mapping every byte value onto ``alphabet``.
+
+    With a 64 characters alphabet the mapping is uniform, shorter alphabets
+    accept a minor modulo bias which is irrelevant for mock values.
+    """
+    chars = alphabet.encode("ascii")
+    return bytes(chars[byte % len(chars)] for byte in range(256))
+
+
+def _random_string(table: bytes, length: int) -> str:
+    """Draw ``length`` random bytes in a single call and map them through ``table``."""
+    return os.urandom(length).translate(table).decode("ascii")
+
+
+_ACCESS_KEY_TABLE = _translate_table(string.ascii_uppercase + string.digits)
+_SECRET_KEY_TABLE = _translate_table(string.ascii_letters + string.digits + "/+")
+_SESSION_TOKEN_TABLE = _SECRET_KEY_TABLE
+_EXTERNAL_ID_TABLE = _translate_table(string.ascii_letters + string.digits + "-_")
 
 
 class MockAWSGenerator:
@@ -16,6 +39,54 @@ class MockAWSGenerator:
     # Standard mock AWS account ID
     MOCK_ACCOUNT_ID = "123456789012"
 
+    # Dedicated generator so tests can seed it without touching the global one
+    _rng: ClassVar[random.Random] = random.Random()
+
+    # ARN templates, bound once so generators only fill in the fields
+    _ROLE_ARN_FMT = "arn:aws:iam::{}:role{}/{}".format
+    _USER_ARN_FMT = "arn:aws:iam::{}:user{}/{}".format
+    _POLICY_ARN_FMT = "arn:aws:iam::{}:policy{}/{}".format
+
+    # Realistic names and paths picked from when none are provided
+    _ROLE_NAMES: tuple[str, ...] = (
+        "web-server-role",
+        "lambda-execution-role",
+        "api-processor-role",
+        "batch-job-role",
+        "ecs-task-role",
+        "rds-access-role",
+        "s3-access-role",
+        "cloudwatch-logs-role",
+    )
+    _ROLE_PATHS: tuple[str, ...] = (
+        "applications",
+        "services/lambda",
+        "infrastructure",
+        "data-processing",
+        "web-tier",
+        "backend-services",
+        "monitoring",
+        "storage",
+    )
+    _USER_NAMES: tuple[str, ...] = (
+        "admin-user",
+        "service-account",
+        "application-user",
+        "readonly-user",
+        "backup-user",
+        "monitoring-user",
+    )
+    _POLICY_NAMES: tuple[str, ...] = (
+        "s3-read-only-policy",
+        "lambda-execution-policy",
+        "ec2-full-access-policy",
+        "rds-access-policy",
+        "cloudwatch-logs-policy",
+        "dynamodb-access-policy",
+        "sns-publish-policy",
+        "sqs-access-policy",
+    )
+
     @classmethod
     def mock_access_key_id(cls) -> str:
         """Generate a mock AWS Access Key ID.
@@ -25,7 +96,7 @@ class MockAWSGenerator:
         """
         # AWS Access Key IDs start with AKIA followed by 16 alphanumeric characters
         prefix = "AKIA"
-        suffix = "".join(random.choices(string.ascii_uppercase + string.digits, k=16))
+        suffix = _random_string(_ACCESS_KEY_TABLE, 16)
         return f"{prefix}{suffix}"
 
     @classmethod
@@ -36,8 +107,7 @@ class MockAWSGenerator:
             Mock secret access key (40 characters)
         """
         # Generate a realistic-looking secret key
-        chars = string.ascii_letters + string.digits + "/+"
-        return "".join(random.choices(chars, k=40))
+        return _random_string(_SECRET_KEY_TABLE, 40)
 
     @classmethod
     def mock_session_token(cls) -> str:
@@ -47,8 +117,7 @@ class MockAWSGenerator:
             Mock session token (longer string, typically 350+ characters)
         """
         # Generate a realistic-looking session token
-        chars = string.ascii_letters + string.digits + "/+="
-        return "".join(random.choices(chars, k=356))
+        return _random_string(_SESSION_TOKEN_TABLE, 356)
 
     @classmethod
     def mock_role_arn(
@@ -73,39 +142,17 @@ class MockAWSGenerator:
 
         if role_name is None:
             # Generate a realistic role name
-            role_names = [
-                "web-server-role",
-                "lambda-execution-role",
-                "api-processor-role",
-                "batch-job-role",
-                "ecs-task-role",
-                "rds-access-role",
-                "s3-access-role",
-                "cloudwatch-logs-role",
-            ]
-            role_name = random.choice(role_names)
+            role_name = cls._rng.choice(cls._ROLE_NAMES)
 
         if path is None:
             # Generate a realistic path
-            paths = [
-                "applications",
-                "services/lambda",
-                "infrastructure",
-                "data-processing",
-                "web-tier",
-                "backend-services",
-                "monitoring",
-                "storage",
-            ]
-            path = random.choice(paths)
+            path = cls._rng.choice(cls._ROLE_PATHS)
 
         # Ensure path starts with / but doesn't end with /
-        if not path.startswith("/"):
-            path = f"/{path}"
-        if path.endswith("/"):
-            path = path.rstrip("/")
+        path = path.strip("/")
+        path = f"/{path}" if path else ""
 
-        return f"arn:aws:iam::{account_id}:role{path}/{role_name}"
+        return cls._ROLE_ARN_FMT(account_id, path, role_name)
 
     @classmethod
     def mock_user_arn(
@@ -129,26 +176,16 @@ class MockAWSGenerator:
 
         if username is None:
             # Generate a realistic username
-            usernames = [
-                "admin-user",
-                "service-account",
-                "application-user",
-                "readonly-user",
-                "backup-user",
-                "monitoring-user",
-            ]
-            username = random.choice(usernames)
+            username = cls._rng.choice(cls._USER_NAMES)
 
         if path is None:
             path = "/users"
 
         # Ensure path starts with / but doesn't end with /
-        if not path.startswith("/"):
-            path = f"/{path}"
-        if path.endswith("/"):
-            path = path.rstrip("/")
+        path = path.strip("/")
+        path = f"/{path}" if path else ""
 
-        return f"arn:aws:iam::{account_id}:user{path}/{username}"
+        return cls._USER_ARN_FMT(account_id, path, username)
 
     @classmethod
     def mock_policy_arn(
@@ -173,28 +210,16 @@ class MockAWSGenerator:
 
         if policy_name is None:
             # Generate a realistic policy name
-            policy_names = [
-                "s3-read-only-policy",
-                "lambda-execution-policy",
-                "ec2-full-access-policy",
-                "rds-access-policy",
-                "cloudwatch-logs-policy",
-                "dynamodb-access-policy",
-                "sns-publish-policy",
-                "sqs-access-policy",
-            ]
-            policy_name = random.choice(policy_names)
+            policy_name = cls._rng.choice(cls._POLICY_NAMES)
 
         if path is None:
             path = "/policies"
 
         # Ensure path starts with / but doesn't end with /
-        if not path.startswith("/"):
-            path = f"/{path}"
-        if path.endswith("/"):
-            path = path.rstrip("/")
+        path = path.strip("/")
+        path = f"/{path}" if path else ""
 
-        return f"arn:aws:iam::{account_id}:policy{path}/{policy_name}"
+        return cls._POLICY_ARN_FMT(account_id, path, policy_name)
 
     @classmethod
     def mock_aws_credentials(cls) -> dict[str, Any]:
@@ -203,10 +228,15 @@ class MockAWSGenerator:
         Returns:
             Dictionary containing mock AWS credentials
         """
+        # Draw the random bytes for all three values at once and slice them
+        raw = os.urandom(16 + 40 + 356)
+        access_key_suffix = raw[:16].translate(_ACCESS_KEY_TABLE)
+        secret_access_key = raw[16:56].translate(_SECRET_KEY_TABLE)
+        session_token = raw[56:].translate(_SESSION_TOKEN_TABLE)
         return {
-            "aws_access_key_id": cls.mock_access_key_id(),
-            "aws_secret_access_key": cls.mock_secret_access_key(),
-            "aws_session_token": cls.mock_session_token(),
+            "aws_access_key_id": f"AKIA{access_key_suffix.decode('ascii')}",
+            "aws_secret_access_key": secret_access_key.decode("ascii"),
+            "aws_session_token": session_token.decode("ascii"),
         }
 
     @classmethod
@@ -228,12 +258,11 @@ class MockAWSGenerator:
         """
         if external_id is None:
             # Generate a realistic external ID
-            chars = string.ascii_letters + string.digits + "-_@"
-            external_id = "".join(random.choices(chars, k=32))
+            external_id = _random_string(_EXTERNAL_ID_TABLE, 32)
 
         return {
             "RoleArn": cls.mock_role_arn(role_name, path),
-            "RoleSessionName": f"test-session-{random.randint(1000, 9999)}",
+            "RoleSessionName": f"test-session-{cls._rng.randint(1000, 9999)}",
             "ExternalId": external_id,
         }
 
@@ -262,17 +291,22 @@ class MockAWSGenerator:
         }
 
 
-# Convenience functions for direct import
+# Convenience functions for direct import.
+# Tests only need well-formed values, so the identifiers below are generated
+# once and reused; use MockAWSGenerator directly when uniqueness matters.
+@functools.cache
 def mock_access_key_id() -> str:
     """Generate a mock AWS Access Key ID."""
     return MockAWSGenerator.mock_access_key_id()
 
 
+@functools.cache
 def mock_secret_access_key() -> str:
     """Generate a mock AWS Secret Access Key."""
     return MockAWSGenerator.mock_secret_access_key()
 
 
+@functools.cache
 def mock_role_arn(role_name: str | None = None, path: str | None = None) -> str:
     """Generate a mock IAM Role ARN."""
     return MockAWSGenerator.mock_role_arn(role_name, path)
@@ -297,8 +331,4 @@ def mock_policy_arn(policy_name: str | None = None, path: str | None = None) ->
 
 def mock_external_id() -> str:
     """Generate a mock AWS External ID."""
-    import random
-    import string
-
-    chars = string.ascii_letters + string.digits + "-_@"
-    return "".join(random.choices(chars, k=32))
+    return _random_string(_EXTERNAL_ID_TABLE, 32)
@@ -6,6 +6,9 @@
 
 from __future__ import annotations
 
+import json
+import functools
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 import pytest
@@ -16,18 +19,60 @@ from credproxy.config import Config
 from credproxy.credentials_handler import CredentialsHandler
 
 
+FULL_CONFIG = {
+    "services": {
+        "test-service": {
+            "auth_token": "valid-token",
+            "source_credentials": {
+                "iam_profile": {"profile_name": "test"},
+                "region": "us-east-1",
+            },
+            "assumed_role": {"RoleArn": "arn:aws:iam::123456789012:role/TestRole"},
+        }
+    },
+    "server": {"host": "0.0.0.0", "port": 1338, "debug": True},
+    "dynamic_services": {
+        "enabled": True,
+        "directories": [
+            {
+                "path": "/tmp/dynamic",
+                "include_patterns": [".*\\.yaml$"],
+                "exclude_patterns": [".*\\.tmp$"],
+            }
+        ],
+        "reload_interval": 5,
+    },
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _config_from_frozen(frozen: str) -> Config:
+    """Build a Config once per distinct JSON-serialised configuration."""
+    return Config.from_dict(json.loads(frozen))
+
+
+def _cached_config(config_data: dict) -> Config:
+    """Return the shared Config for config_data. Tests must not mutate it."""
+    return _config_from_frozen(json.dumps(config_data, sort_keys=True))
+
+
+@pytest.fixture(scope="session")
+def full_service_app(build_app):
+    """Flask app built once from a configuration with services."""
+    return build_app(_cached_config(FULL_CONFIG))
+
+
 class TestAppInitialization:
     """Test Flask application initialization."""
 
-    def test_init_app_minimal_config(self):
+    def test_init_app_minimal_config(self, base_app):
         """Test app initialization with minimal configuration."""
-        config = Config()
-        app = init_app(config)
+        app = base_app
 
         # Check basic app setup
         assert app is not None
         assert "credproxy_config" in app.config
-        assert app.config["credproxy_config"] is config
+        assert isinstance(app.config["credproxy_config"], Config)
         assert "credentials_handler" in app.config
         assert "file_watcher" in app.config
 
@@ -35,39 +80,14 @@ class TestAppInitialization:
         blueprint_names = [bp.name for bp in app.blueprints.values()]
         assert "api" in blueprint_names
 
-    def test_init_app_with_full_config(self):
+    def test_init_app_with_full_config(self, full_service_app):
         """Test app initialization with complete configuration."""
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                }
-            },
-            "server": {"host": "0.0.0.0", "port": 1338, "debug": True},
-            "dynamic_services": {
-                "enabled": True,
-                "directories": [
-                    {
-                        "path": "/tmp/dynamic",
-                        "include_patterns": [".*\\.yaml$"],
-                        "exclude_patterns": [".*\\.tmp$"],
-                    }
-                ],
-                "reload_interval": 5,
-            },
-        }
-        config = Config.from_dict(config_data)
-        app = init_app(config)
+        app = full_service_app
 
         # Verify config is stored
-        assert app.config["credproxy_config"] is config
+        config = app.config["credproxy_config"]
+        assert isinstance(config, Config)
+        assert "test-service" in config.services
 
         # Verify credentials handler is created
         credentials_handler = app.config["credentials_handler"]
@@ -85,32 +105,7 @@ class TestAppInitialization:
         mock_file_watcher.start.side_effect = Exception("File system error")
         mock_file_watcher_class.return_value = mock_file_watcher
 
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                }
-            },
-            "dynamic_services": {
-                "enabled": True,
-                "directories": [
-                    {
-                        "path": "/tmp/dynamic",
-                        "include_patterns": [".*\\.yaml$"],
-                        "exclude_patterns": [".*\\.tmp$"],
-                    }
-                ],
-                "reload_interval": 5,
-            },
-        }
-        config = Config.from_dict(config_data)
+        config = _cached_config(FULL_CONFIG)
 
         # Should not raise exception, should continue gracefully
         app = init_app(config)
@@ -120,30 +115,22 @@ class TestAppInitialization:
         # File watcher start should have been attempted
         mock_file_watcher.start.assert_called_once()
 
-    def test_init_app_request_id_generation(self):
+    def test_init_app_request_id_generation(self, base_app, client):
         """Test that request ID generation is set up."""
-        config = Config()
-        app = init_app(config)
-
-        with app.test_request_context("/"):
+        with base_app.test_request_context("/"):
             # Check that request_id is set in g context
-            with app.test_client() as client:
-                response = client.get("/health")
-                # Should succeed without error
-                assert response.status_code == 200
+            response = client.get("/health")
+            # Should succeed without error
+            assert response.status_code == 200
 
-    def test_init_app_shutdown_middleware(self):
+    def test_init_app_shutdown_middleware(self, base_app, client, monkeypatch):
         """Test shutdown middleware functionality."""
-        config = Config()
-        app = init_app(config)
+        # Set shutdown flag, reverted once the test completes
+        monkeypatch.setitem(base_app.config, "_shutdown_requested", True)
 
-        # Set shutdown flag
-        app.config["_shutdown_requested"] = True
-
-        with app.test_client() as client:
-            response = client.get("/health")
-            assert response.status_code == 503
-            assert "Service shutting down" in response.get_data(as_text=True)
+        response = client.get("/health")
+        assert response.status_code == 503
+        assert "Service shutting down" in response.get_data(as_text=True)
 
 
 class TestServiceContext:
@@ -161,169 +148,32 @@ class TestServiceContext:
         with pytest.raises(RuntimeError):
             set_service_context()
 
-    def test_set_service_context_with_valid_token(self):
-        """Test set_service_context with valid authorization token."""
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "valid-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                }
-            }
-        }
-        config = Config.from_dict(config_data)
-        app = init_app(config)
-
-        # Test with proper request context
-        with app.test_request_context(
-            "/credentials", headers={"Authorization": "valid-token"}
-        ):
-            # Patch request at module level
-            with patch("credproxy.app.request") as mock_request:
-                mock_request.endpoint = "api.get_credentials"
-                mock_request.headers = Mock()
-                mock_request.headers.get.return_value = "valid-token"
-
-                set_service_context()
-
-                # Verify service context was set
-                assert hasattr(g, "service_name")
-                assert g.service_name == "test-service"
-
-    def test_set_service_context_with_source_file(self):
-        """Test set_service_context when service has source_file."""
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "valid-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                    "x-source-file": "/path/to/service.yaml",
-                }
-            }
-        }
-        config = Config.from_dict(config_data)
-        app = init_app(config)
-
-        # Test with proper request context
-        with app.test_request_context(
-            "/credentials", headers={"Authorization": "valid-token"}
+    @pytest.mark.parametrize(
+        "endpoint,token,expect_service",
+        [
+            ("api.get_credentials", "valid-token", True),
+            ("api.get_credentials", "invalid-token", False),
+            ("api.get_credentials", None, False),
+            ("api.health_check", "valid-token", False),
+        ],
+        ids=["valid_token", "invalid_token", "no_auth_header", "other_endpoint"],
+    )
+    def test_set_service_context(
+        self, full_service_app, endpoint, token, expect_service
+    ):
+        """Test set_service_context for each endpoint and token combination."""
+        # Plain struct rather than a full request context: only the endpoint
+        # and the Authorization header are read
+        headers = {"Authorization": token} if token else {}
+        fake_request = SimpleNamespace(endpoint=endpoint, headers=headers)
+        with (
+            full_service_app.app_context(),
+            patch("credproxy.app.request", fake_request),
         ):
-            # Mock the endpoint to match get_credentials
-            with patch("credproxy.app.request") as mock_request:
-                mock_request.endpoint = "api.get_credentials"
-                mock_request.headers = Mock()
-                mock_request.headers.get.return_value = "valid-token"
-
-                set_service_context()
+            set_service_context()
 
-                # Verify both service name and source file were set
-                assert hasattr(g, "service_name")
-                assert hasattr(g, "service_source_file")
+            # Service name and source file are only set for a known token
+            assert hasattr(g, "service_name") is expect_service
+            assert hasattr(g, "service_source_file") is expect_service
+            if expect_service:
                 assert g.service_name == "test-service"
-                assert g.service_source_file is not None
-
-    def test_set_service_context_no_auth_header(self):
-        """Test set_service_context when no authorization header is provided."""
-
-        config = Config()
-        app = init_app(config)
-
-        # Test with proper request context but no auth header
-        with app.test_request_context("/credentials"):
-            # Mock the endpoint to match get_credentials but no auth header
-            with patch("credproxy.app.request") as mock_request:
-                mock_request.endpoint = "api.get_credentials"
-                mock_request.headers = Mock()
-                mock_request.headers.get.return_value = None
-
-                set_service_context()
-
-                # Verify no service context was set
-                assert not hasattr(g, "service_name")
-                assert not hasattr(g, "service_source_file")
-
-    def test_set_service_context_invalid_token(self):
-        """Test set_service_context with invalid authorization token."""
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "valid-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                }
-            }
-        }
-        config = Config.from_dict(config_data)
-        app = init_app(config)
-
-        # Test with proper request context but invalid token
-        with app.test_request_context(
-            "/credentials", headers={"Authorization": "invalid-token"}
-        ):
-            # Mock the endpoint to match get_credentials
-            with patch("credproxy.app.request") as mock_request:
-                mock_request.endpoint = "api.get_credentials"
-                mock_request.headers = Mock()
-                mock_request.headers.get.return_value = "invalid-token"
-
-                set_service_context()
-
-                # Verify no service context was set for invalid token
-                assert not hasattr(g, "service_name")
-                assert not hasattr(g, "service_source_file")
-
-    def test_set_service_context_non_credentials_endpoint(self):
-        """Test set_service_context when endpoint is not get_credentials."""
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "valid-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test"},
-                        "region": "us-east-1",
-                    },
-                    "assumed_role": {
-                        "RoleArn": "arn:aws:iam::123456789012:role/TestRole"
-                    },
-                }
-            }
-        }
-        config = Config.from_dict(config_data)
-        app = init_app(config)
-
-        # Test with non-credentials endpoint
-        with app.test_request_context(
-            "/health", headers={"Authorization": "valid-token"}
-        ):
-            # Mock the endpoint to be something other than get_credentials
-            with patch("credproxy.app.request") as mock_request:
-                mock_request.endpoint = "health_check"
-                mock_request.headers = Mock()
-                mock_request.headers.get.return_value = "valid-token"
-
-                set_service_context()
-
-                # Verify no service context was set for non-credentials endpoint
-                assert not hasattr(g, "service_name")
-                assert not hasattr(g, "service_source_file")
@@ -6,8 +6,6 @@
 
 from __future__ import annotations
 
-import os
-import tempfile
 from unittest.mock import patch
 
 import yaml
@@ -16,6 +14,51 @@ import pytest
 from credproxy.cli import main, create_parser
 from tests.mock_aws import mock_role_arn, mock_access_key_id, mock_secret_access_key
 from credproxy.runner import validate_config_file
+from tests.yaml_helpers import Dumper
+
+
+_MOCK_ACCESS_KEY = mock_access_key_id()
+_MOCK_SECRET_KEY = mock_secret_access_key()
+_MOCK_ROLE = mock_role_arn()
+
+_BASE_CONFIG_DATA = {
+    "aws_defaults": {
+        "region": "us-west-2",
+        "iam_keys": {
+            "aws_access_key_id": _MOCK_ACCESS_KEY,
+            "aws_secret_access_key": _MOCK_SECRET_KEY,
+        },
+    },
+    "services": {
+        "test-service": {
+            "auth_token": "test-token",
+            "source_credentials": {
+                "region": "us-west-2",
+            },
+            "assumed_role": {
+                "RoleArn": _MOCK_ROLE,
+                "RoleSessionName": "test-session",
+            },
+        }
+    },
+}
+
+
+@pytest.fixture(scope="module")
+def cli_config_path(tmp_path_factory):
+    """Write the common valid CLI configuration once and return its path."""
+    config_file = tmp_path_factory.mktemp("cli") / "config.yaml"
+    config_file.write_text(yaml.dump(_BASE_CONFIG_DATA, Dumper=Dumper))
+    return str(config_file)
+
+
+@pytest.fixture(scope="module")
+def invalid_cli_config_path(tmp_path_factory):
+    """Write a configuration defining no services once and return its path."""
+    config_file = tmp_path_factory.mktemp("cli") / "invalid.yaml"
+    # Only needs to fail validation, so raw YAML is enough
+    config_file.write_bytes(b"aws_defaults:\n  region: us-west-2\n")
+    return str(config_file)
 
 
 class TestCLI:
@@ -39,6 +82,14 @@ class TestCLI:
         assert args.validate_only is True
         assert args.log_level == "DEBUG"
 
+    def test_create_parser_is_shared(self):
+        """Test the parser is built once and reused across calls."""
+        parser = create_parser()
+        parser.parse_args(["--config", "other.yaml"])
+
+        assert create_parser() is parser
+        assert create_parser().parse_args([]).config == "/credproxy/config.yaml"
+
     def test_log_level_argument(self):
         """Test log level argument parsing."""
         parser = create_parser()
@@ -51,186 +102,15 @@ class TestCLI:
         args = parser.parse_args(["--log-level", "ERROR"])
         assert args.log_level == "ERROR"
 
-    def test_validate_config_success(self):
+    def test_validate_config_success(self, cli_config_path):
         """Test successful configuration validation."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {"RoleArn": mock_role},
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            result = validate_config_file(temp_file)
-            assert result is True
-        finally:
-            os.unlink(temp_file)
+        result = validate_config_file(cli_config_path)
+        assert result is True
 
-    def test_validate_config_failure(self):
+    def test_validate_config_failure(self, invalid_cli_config_path):
         """Test configuration validation failure."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    # Missing source_credentials entirely - this should fail
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            result = validate_config_file(temp_file)
-            assert result is False
-        finally:
-            os.unlink(temp_file)
-
-    @patch("flask.Flask.run")
-    def test_main_run_app(self, mock_flask_run):
-        """Test main function running the application."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            result = main(["--config", temp_file, "--log-level", "WARNING"])
-            assert result == 0
-            mock_flask_run.assert_called_once()
-        finally:
-            os.unlink(temp_file)
-
-    def test_main_validate_only(self):
-        """Test main function with validate-only flag."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            result = main(["--config", temp_file, "--validate-only"])
-
-            assert result == 0
-        finally:
-            os.unlink(temp_file)
-
-    def test_main_keyboard_interrupt(self):
-        """Test main function with keyboard interrupt during app run."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with patch("flask.Flask.run", side_effect=KeyboardInterrupt()):
-                result = main(["--config", temp_file])
-                assert result == 0
-        finally:
-            os.unlink(temp_file)
+        result = validate_config_file(invalid_cli_config_path)
+        assert result is False
 
     def test_main_config_file_not_found(self):
         """Test main function with missing config file."""
@@ -244,126 +124,43 @@ class TestCLI:
 
         assert exc_info.value.code == 0
 
-    def test_dev_flag_sets_debug_log_level(self):
-        """Test that --dev flag sets log level to DEBUG when not explicitly set."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with patch("flask.Flask.run") as mock_flask_run:
-                result = main(["--config", temp_file, "--dev"])
-                assert result == 0
-                mock_flask_run.assert_called_once()
-        finally:
-            os.unlink(temp_file)
-
-    def test_dev_flag_preserves_existing_log_level(self):
-        """Test that --dev flag preserves existing log level when set."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with patch("flask.Flask.run") as mock_flask_run:
-                result = main(
-                    ["--config", temp_file, "--dev", "--log-level", "WARNING"]
-                )
-                assert result == 0
-                mock_flask_run.assert_called_once()
-        finally:
-            os.unlink(temp_file)
-
-    def test_validation_exception_handling(self):
-        """Test exception handling during validation."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with patch(
+    @pytest.mark.parametrize(
+        "extra_args,patch_target,side_effect,expected_result,expected_calls",
+        [
+            (["--log-level", "WARNING"], "flask.Flask.run", None, 0, 1),
+            (["--validate-only"], "flask.Flask.run", None, 0, 0),
+            ([], "flask.Flask.run", KeyboardInterrupt(), 0, 1),
+            (["--dev"], "flask.Flask.run", None, 0, 1),
+            (["--dev", "--log-level", "WARNING"], "flask.Flask.run", None, 0, 1),
+            (
+                ["--validate-only"],
                 "credproxy.runner.validate_config_file",
-                side_effect=Exception("Validation error"),
-            ):
-                result = main(["--config", temp_file, "--validate-only"])
-                assert result == 1
-        finally:
-            os.unlink(temp_file)
+                Exception("Validation error"),
+                1,
+                1,
+            ),
+        ],
+        ids=[
+            "run_app",
+            "validate_only",
+            "keyboard_interrupt",
+            "dev_flag_sets_debug_log_level",
+            "dev_flag_preserves_existing_log_level",
+            "validation_exception_handling",
+        ],
+    )
+    def test_main(
+        self,
+        cli_config_path,
+        extra_args,
+        patch_target,
+        side_effect,
+        expected_result,
+        expected_calls,
+    ):
+        """Test main function outcomes for the supported flag combinations."""
+        with patch(patch_target, side_effect=side_effect) as mock_target:
+            result = main(["--config", cli_config_path, *extra_args])
+
+        assert result == expected_result
+        assert mock_target.call_count == expected_calls
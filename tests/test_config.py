@@ -7,16 +7,77 @@
 from __future__ import annotations
 
 import os
-import tempfile
+import copy
+import json
+from unittest.mock import patch
 
 import yaml
 import pytest
 
 from tests.mock_aws import mock_role_arn, mock_access_key_id, mock_secret_access_key
-from credproxy.config import Config, IAMKeysAuthConfig
+from credproxy.config import Config, IAMKeysAuthConfig, _parse_config_file
 from credproxy.substitutions import FROM_ENV_TAG, FROM_FILE_TAG, TAG_SEPARATOR
 
 
+_MOCK_ACCESS_KEY = mock_access_key_id()
+_MOCK_SECRET_KEY = mock_secret_access_key()
+_MOCK_ROLE = mock_role_arn()
+
+_BASE_SERVICE = {
+    "auth_token": "test-token",
+    "source_credentials": {"region": "us-west-2"},
+    "assumed_role": {
+        "RoleArn": _MOCK_ROLE,
+        "RoleSessionName": "test-session",
+    },
+}
+
+_BASE_CONFIG = {
+    "aws_defaults": {"region": "us-west-2"},
+    "services": {"test-service": _BASE_SERVICE},
+}
+
+
+def _base_config() -> dict:
+    """Return a fresh copy of the base configuration to modify."""
+    return copy.deepcopy(_BASE_CONFIG)
+
+
+@pytest.fixture(scope="session")
+def yaml_fixtures(tmp_path_factory):
+    """Write the shared configuration files once and return their paths by name."""
+    fixtures_dir = tmp_path_factory.mktemp("config")
+    paths = {
+        "valid": str(fixtures_dir / "valid.yaml"),
+        "malformed": str(fixtures_dir / "malformed.yaml"),
+    }
+
+    # Fixtures are written as JSON, which the YAML loader reads as-is and
+    # which the C-accelerated json encoder emits much faster than yaml.dump
+    with open(paths["valid"], "w") as f:
+        json.dump(_BASE_CONFIG, f)
+    with open(paths["malformed"], "w") as f:
+        f.write("invalid: yaml: content: [")
+
+    return paths
+
+
+@pytest.fixture(scope="class")
+def yaml_tmp_dir(tmp_path_factory):
+    """Directory created once per test class for the config files it writes."""
+    return tmp_path_factory.mktemp("cfg")
+
+
+@pytest.fixture
+def yaml_tmp(yaml_tmp_dir, request):
+    """Path of the current test's config file inside the class directory.
+
+    Named after the test so that tests of a class never rewrite each other's
+    configuration file.
+    """
+    return yaml_tmp_dir / f"{request.node.name}.yaml"
+
+
 def env_var(name: str) -> str:
     """Helper to build environment variable pattern."""
     return f"${{{FROM_ENV_TAG}{TAG_SEPARATOR}{name}}}"
@@ -30,195 +91,66 @@ def file_var(path: str) -> str:
 class TestConfig:
     """Test configuration functionality."""
 
-    def test_from_file_with_substitutions(self):
+    def test_from_file_with_substitutions(self, yaml_tmp, monkeypatch):
         """Test loading config with variable substitutions."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": env_var("TEST_TOKEN"),
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
+        config_data = _base_config()
+        config_data["aws_defaults"]["iam_keys"] = {
+            "aws_access_key_id": _MOCK_ACCESS_KEY,
+            "aws_secret_access_key": _MOCK_SECRET_KEY,
         }
+        config_data["services"]["test-service"]["auth_token"] = env_var("TEST_TOKEN")
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            # Set environment variable for substitution
-            os.environ["TEST_TOKEN"] = "substituted-token"
+        yaml_tmp.write_text(json.dumps(config_data))
 
-            config = Config.from_file(temp_file)
+        # Set environment variable for substitution, reverted after the test
+        monkeypatch.setenv("TEST_TOKEN", "substituted-token")
 
-            # Verify substitution worked
-            assert config.services["test-service"].auth_token == "substituted-token"
+        config = Config.from_file(str(yaml_tmp))
 
-        finally:
-            os.unlink(temp_file)
-            if "TEST_TOKEN" in os.environ:
-                del os.environ["TEST_TOKEN"]
+        # Verify substitution worked
+        assert config.services["test-service"].auth_token == "substituted-token"
 
-    def test_from_file_with_file_substitution(self):
+    def test_from_file_with_file_substitution(self, yaml_tmp):
         """Test loading config with file variable substitution."""
-        mock_role = mock_role_arn()
-
         # Create a dummy file for the substitution to read first
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".txt", delete=False
-        ) as secret_file:
-            secret_file.write("dummy-token")
-            secret_file_path = secret_file.name
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": file_var(secret_file_path),
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
+        secret_file = yaml_tmp.with_suffix(".txt")
+        secret_file.write_text("dummy-token")
+        secret_file_path = str(secret_file)
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_data = _base_config()
+        config_data["services"]["test-service"]["auth_token"] = file_var(
+            secret_file_path
+        )
 
-        try:
-            config = Config.from_file(temp_file)
+        yaml_tmp.write_text(json.dumps(config_data))
 
-            # Verify file substitution worked - actual content, not the pattern
-            assert config.services["test-service"].auth_token == "dummy-token"
+        config = Config.from_file(str(yaml_tmp))
 
-        finally:
-            os.unlink(temp_file)
-            os.unlink(secret_file_path)
+        # Verify file substitution worked - actual content, not the pattern
+        assert config.services["test-service"].auth_token == "dummy-token"
 
     def test_validate_services_empty(self):
         """Test validation with empty services."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            # Should load successfully with at least one service
-            config = Config.from_file(temp_file)
-            assert "test-service" in config.services
-
-        finally:
-            os.unlink(temp_file)
+        # Should load successfully with at least one service
+        config = Config.from_dict(_base_config())
+        assert "test-service" in config.services
 
     def test_validate_schema_schema_error(self):
         """Test validation with schema error."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        # Missing required role_arn
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_data = _base_config()
+        # Missing required RoleArn
+        del config_data["services"]["test-service"]["assumed_role"]["RoleArn"]
 
-        try:
-            with pytest.raises(ValueError, match="Configuration validation failed"):
-                Config.from_file(temp_file)
-
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="Configuration validation failed"):
+            Config.from_dict(config_data)
 
     def test_validate_schema_general_error(self):
         """Test validation with general error."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "invalid-region-format",  # Invalid region format
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
+        config_data = _base_config()
+        config_data["aws_defaults"]["region"] = "invalid-region-format"
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with pytest.raises(ValueError, match="Configuration validation failed"):
-                Config.from_file(temp_file)
-
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="Configuration validation failed"):
+            Config.from_dict(config_data)
 
 
 class TestServiceConfig:
@@ -226,52 +158,23 @@ class TestServiceConfig:
 
     def test_service_config_inheritance(self):
         """Test service configuration inheritance from defaults."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {
-                "region": "us-west-2",
-                "iam_keys": {
-                    "aws_access_key_id": mock_access_key,
-                    "aws_secret_access_key": mock_secret_key,
-                },
-            },
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {
-                        "region": "us-west-2",
-                    },
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                },
-            },
+        config_data = _base_config()
+        config_data["aws_defaults"]["iam_keys"] = {
+            "aws_access_key_id": _MOCK_ACCESS_KEY,
+            "aws_secret_access_key": _MOCK_SECRET_KEY,
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            service = config.services["test-service"]
+        config = Config.from_dict(config_data)
+        service = config.services["test-service"]
 
-            # Should inherit iam_keys from defaults
-            assert service.source_credentials.iam_keys is not None
-            assert (
-                service.source_credentials.iam_keys.aws_access_key_id == mock_access_key
-            )
-            assert (
-                service.source_credentials.iam_keys.aws_secret_access_key
-                == mock_secret_key
-            )
-
-        finally:
-            os.unlink(temp_file)
+        # Should inherit iam_keys from defaults
+        assert service.source_credentials.iam_keys is not None
+        assert service.source_credentials.iam_keys.aws_access_key_id == (
+            _MOCK_ACCESS_KEY
+        )
+        assert service.source_credentials.iam_keys.aws_secret_access_key == (
+            _MOCK_SECRET_KEY
+        )
 
 
 class TestAuthMethodConfigs:
@@ -279,16 +182,13 @@ class TestAuthMethodConfigs:
 
     def test_iam_profile_config(self):
         """Test IAM profile configuration."""
-        mock_access_key = mock_access_key_id()
-        mock_secret_key = mock_secret_access_key()
-
         iam_profile_config = IAMKeysAuthConfig(
-            aws_access_key_id=mock_access_key,
-            aws_secret_access_key=mock_secret_key,
+            aws_access_key_id=_MOCK_ACCESS_KEY,
+            aws_secret_access_key=_MOCK_SECRET_KEY,
         )
 
-        assert iam_profile_config.aws_access_key_id == mock_access_key
-        assert iam_profile_config.aws_secret_access_key == mock_secret_key
+        assert iam_profile_config.aws_access_key_id == _MOCK_ACCESS_KEY
+        assert iam_profile_config.aws_secret_access_key == _MOCK_SECRET_KEY
 
 
 class TestConfigExceptions:
@@ -299,121 +199,44 @@ class TestConfigExceptions:
         with pytest.raises(FileNotFoundError):
             Config.from_file("/non/existent/path.yaml")
 
-    def test_from_file_malformed_yaml(self):
+    def test_from_file_malformed_yaml(self, yaml_fixtures):
         """Test loading malformed YAML file."""
-        malformed_yaml = "invalid: yaml: content: ["
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(malformed_yaml)
-            temp_file = f.name
-
-        try:
-            with pytest.raises(ValueError, match="File is not valid YAML or JSON"):
-                Config.from_file(temp_file)
-
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="File is not valid YAML or JSON"):
+            Config.from_file(yaml_fixtures["malformed"])
 
     def test_validate_no_services(self):
         """Test validation with missing services section."""
         config_data = {"aws_defaults": {"region": "us-west-2"}}
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with pytest.raises(ValueError, match="Configuration validation failed"):
-                Config.from_file(temp_file)
-
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="Configuration validation failed"):
+            Config.from_dict(config_data)
 
     def test_validate_missing_auth_token(self):
         """Test validation with missing auth token."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_data = _base_config()
+        del config_data["services"]["test-service"]["auth_token"]
 
-        try:
-            with pytest.raises(ValueError, match="Configuration validation failed"):
-                Config.from_file(temp_file)
-
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="Configuration validation failed"):
+            Config.from_dict(config_data)
 
     def test_validate_missing_region(self):
         """Test validation with missing region."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {},  # Missing region
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {},  # Missing region
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with pytest.raises(
-                ValueError, match="AWS region is required for service 'test-service'"
-            ):
-                Config.from_file(temp_file)
+        config_data = _base_config()
+        config_data["aws_defaults"] = {}  # Missing region
+        config_data["services"]["test-service"]["source_credentials"] = {}
 
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(
+            ValueError, match="AWS region is required for service 'test-service'"
+        ):
+            Config.from_dict(config_data)
 
     def test_validate_missing_role_arn(self):
         """Test validation with missing role ARN."""
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        # Missing role_arn
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            with pytest.raises(ValueError, match="Configuration validation failed"):
-                Config.from_file(temp_file)
+        config_data = _base_config()
+        del config_data["services"]["test-service"]["assumed_role"]["RoleArn"]
 
-        finally:
-            os.unlink(temp_file)
+        with pytest.raises(ValueError, match="Configuration validation failed"):
+            Config.from_dict(config_data)
 
 
 class TestConfigEdgeCases:
@@ -425,42 +248,92 @@ class TestConfigEdgeCases:
         with pytest.raises(FileNotFoundError):
             Config.from_file("/non/existent/default/path.yaml")
 
-    def test_from_file_env_variable(self):
+    def test_from_file_env_variable(self, yaml_fixtures, monkeypatch):
         """Test loading config file path from environment variable."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
+        # Set environment variable to override config path
+        monkeypatch.setenv("CREDPROXY_CONFIG_FILE", yaml_fixtures["valid"])
+
+        config = Config.from_file()  # Should use env var
+        assert config.services["test-service"].auth_token == "test-token"
+
+    def test_from_file_reuses_parsed_file(self, yaml_tmp):
+        """Test that an unchanged file is parsed once and re-parsed on change."""
+        config_data = _base_config()
+        config_data["services"]["test-service"]["assumed_role"]["TransitiveTagKeys"] = [
+            "team"
+        ]
+        config_data["dynamic_services"] = {
+            "enabled": False,
+            "directories": [
+                {"path": "/tmp/dynamic", "include_patterns": [r".*\.yaml$"]}
+            ],
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            # Set environment variable to override config path
-            original_env = os.environ.get("CREDPROXY_CONFIG_FILE")
-            os.environ["CREDPROXY_CONFIG_FILE"] = temp_file
-
-            config = Config.from_file()  # Should use env var
-            assert config.services["test-service"].auth_token == "test-token"
-
-        finally:
-            os.unlink(temp_file)
-            if original_env is not None:
-                os.environ["CREDPROXY_CONFIG_FILE"] = original_env
-            elif "CREDPROXY_CONFIG_FILE" in os.environ:
-                del os.environ["CREDPROXY_CONFIG_FILE"]
+        yaml_tmp.write_text(json.dumps(config_data))
+        config_path = str(yaml_tmp)
+
+        with patch("credproxy.config.yaml.load", wraps=yaml.load) as load:
+            Config.from_file(config_path)
+            Config.from_file(config_path)
+            assert load.call_count == 1
+
+            config_data["services"]["test-service"]["auth_token"] = "new-token"
+            yaml_tmp.write_text(json.dumps(config_data))
+
+            config = Config.from_file(config_path)
+            assert load.call_count == 2
+            assert config.services["test-service"].auth_token == "new-token"
+
+        # Mutating a loaded config must not leak into the cached parse
+        config.dynamic_services.directories[0].include_patterns.append("x")
+        config.services["test-service"].assumed_role.TransitiveTagKeys.append("x")
+        reloaded = Config.from_file(config_path)
+        assert reloaded.dynamic_services.directories[0].include_patterns == [
+            r".*\.yaml$"
+        ]
+        assert reloaded.services["test-service"].assumed_role.TransitiveTagKeys == [
+            "team"
+        ]
+
+    def test_from_file_same_size_rewrite(self, yaml_tmp):
+        """Test a rewrite keeping the size and mtime is not served stale."""
+        config_data = _base_config()
+        yaml_tmp.write_text(json.dumps(config_data))
+        file_stat = yaml_tmp.stat()
+        Config.from_file(str(yaml_tmp))
+
+        config_data["services"]["test-service"]["auth_token"] = "abcd-token"
+        yaml_tmp.write_text(json.dumps(config_data))
+        os.utime(yaml_tmp, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+        assert yaml_tmp.stat().st_size == file_stat.st_size
+
+        config = Config.from_file(str(yaml_tmp))
+        assert config.services["test-service"].auth_token == "abcd-token"
+
+    def test_from_file_json_sidecar(self, yaml_tmp, monkeypatch):
+        """Test parsed YAML is reused from the JSON sidecar when enabled."""
+        monkeypatch.setenv("CREDPROXY_CONFIG_JSON_CACHE", "true")
+        yaml_tmp.write_text(json.dumps(_BASE_CONFIG))
+        sidecar = yaml_tmp.with_name(yaml_tmp.name + ".cache.json")
+
+        Config.from_file(str(yaml_tmp))
+        assert json.loads(sidecar.read_text())["data"] == _BASE_CONFIG
+
+        # A fresh process only has the sidecar: YAML is not parsed again
+        _parse_config_file.cache_clear()
+        with patch("credproxy.config.yaml.load", wraps=yaml.load) as load:
+            config = Config.from_file(str(yaml_tmp))
+        assert load.call_count == 0
+        assert config.services["test-service"].auth_token == "test-token"
+
+        # Editing the file makes the sidecar stale
+        config_data = _base_config()
+        config_data["services"]["test-service"]["auth_token"] = "new-token"
+        yaml_tmp.write_text(json.dumps(config_data))
+        with patch("credproxy.config.yaml.load", wraps=yaml.load) as load:
+            config = Config.from_file(str(yaml_tmp))
+        assert load.call_count == 1
+        assert config.services["test-service"].auth_token == "new-token"
 
 
 class TestConfigDefaults:
@@ -468,41 +341,17 @@ class TestConfigDefaults:
 
     def test_default_values(self):
         """Test that default values are applied correctly."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "aws_defaults": {"region": "us-west-2"},
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            },
-        }
+        config = Config.from_dict(_base_config())
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        # Check default server values
+        assert config.server.host == "localhost"
+        assert config.server.port == 1338
+        assert config.server.debug is False
 
-        try:
-            config = Config.from_file(temp_file)
-
-            # Check default server values
-            assert config.server.host == "localhost"
-            assert config.server.port == 1338
-            assert config.server.debug is False
-
-            # Check default credentials values
-            assert config.credentials.refresh_buffer_seconds == 300
-            assert config.credentials.retry_delay == 60
-            assert config.credentials.request_timeout == 30
-
-        finally:
-            os.unlink(temp_file)
+        # Check default credentials values
+        assert config.credentials.refresh_buffer_seconds == 300
+        assert config.credentials.retry_delay == 60
+        assert config.credentials.request_timeout == 30
 
 
 class TestConfigEdgeCasesAndCoverage:
@@ -521,126 +370,59 @@ class TestConfigEdgeCasesAndCoverage:
 
     def test_get_service_name_by_token_not_found(self):
         """Test token lookup when token is not found."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "valid-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            }
-        }
+        config = Config.from_dict(_base_config())
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        # Test with invalid token
+        result = config.get_service_name_by_token("invalid-token")
+        assert result is None
 
-        try:
-            config = Config.from_file(temp_file)
+    def test_get_service_name_by_token_tracks_dynamic_services(self):
+        """Test the token index follows services added and removed at runtime."""
+        config = Config.from_dict(_base_config())
+        service_config = copy.copy(config.services["test-service"])
+        service_config.auth_token = "dynamic-token"
 
-            # Test with invalid token
-            result = config.get_service_name_by_token("invalid-token")
-            assert result is None
+        assert config.add_service("dynamic-service", service_config) is True
+        assert config.get_service_name_by_token("dynamic-token") == "dynamic-service"
+        assert config.get_service_name_by_token("test-token") == "test-service"
 
-        finally:
-            os.unlink(temp_file)
+        assert config.remove_service("dynamic-service") is True
+        assert config.get_service_name_by_token("dynamic-token") is None
 
-    def test_add_service_already_exists(self):
-        """Test add_service when service already exists."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "services": {
-                "existing-service": {
-                    "auth_token": "existing-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "existing-session",
-                    },
-                }
-            }
-        }
+    def test_token_mapping_is_swapped_not_mutated(self):
+        """Test lookups holding the previous mapping keep a complete view."""
+        config = Config.from_dict(_base_config())
+        previous_mapping = config._token_to_service
+        service_config = copy.copy(config.services["test-service"])
+        service_config.auth_token = "dynamic-token"
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config.add_service("dynamic-service", service_config)
 
-        try:
-            config = Config.from_file(temp_file)
+        assert config._token_to_service is not previous_mapping
+        assert previous_mapping == {"test-token": "test-service"}
 
-            # Try to add a service with the same name
-            new_service_config = config.services["existing-service"]
-            result = config.add_service("existing-service", new_service_config)
-            assert result is False
+    def test_add_service_already_exists(self):
+        """Test add_service when service already exists."""
+        config = Config.from_dict(_base_config())
 
-        finally:
-            os.unlink(temp_file)
+        # Try to add a service with the same name
+        new_service_config = config.services["test-service"]
+        result = config.add_service("test-service", new_service_config)
+        assert result is False
 
     def test_remove_service_not_found(self):
         """Test remove_service when service doesn't exist."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            }
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-
-            # Try to remove a service that doesn't exist
-            result = config.remove_service("non-existent-service")
-            assert result is False
+        config = Config.from_dict(_base_config())
 
-        finally:
-            os.unlink(temp_file)
+        # Try to remove a service that doesn't exist
+        result = config.remove_service("non-existent-service")
+        assert result is False
 
     def test_update_service_not_found(self):
         """Test update_service when service doesn't exist."""
-        mock_role = mock_role_arn()
-
-        config_data = {
-            "services": {
-                "test-service": {
-                    "auth_token": "test-token",
-                    "source_credentials": {"region": "us-west-2"},
-                    "assumed_role": {
-                        "RoleArn": mock_role,
-                        "RoleSessionName": "test-session",
-                    },
-                }
-            }
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-
-            # Try to update a service that doesn't exist
-            service_config = config.services["test-service"]
-            result = config.update_service("non-existent-service", service_config)
-            assert result is False
+        config = Config.from_dict(_base_config())
 
-        finally:
-            os.unlink(temp_file)
+        # Try to update a service that doesn't exist
+        service_config = config.services["test-service"]
+        result = config.update_service("non-existent-service", service_config)
+        assert result is False
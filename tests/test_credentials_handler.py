@@ -7,47 +7,156 @@
 from __future__ import annotations
 
 import time
-from datetime import datetime, timezone, timedelta
-from unittest.mock import MagicMock, patch
-
+import asyncio
+import threading
+from types import SimpleNamespace
+from datetime import datetime, timezone
+from unittest.mock import Mock, MagicMock, patch
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
 import pytest
-
-from credproxy.credentials_handler import CredentialsHandler, ServiceCredentialsManager
+from botocore.exceptions import ClientError
+
+from credproxy import credentials_handler
+from credproxy.config import (
+    AssumedRoleConfig,
+    IAMKeysAuthConfig,
+    IAMProfileAuthConfig,
+    SourceCredentialsConfig,
+)
+from credproxy.credentials_handler import (
+    CredentialsHandler,
+    RefreshBackoffError,
+    ServiceCredentialsManager,
+)
+
+
+class FakeClock:
+    """Clock standing in for the wall and monotonic clocks of the handler."""
+
+    def __init__(self, start: float = 1_700_000_000.0):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def expiration(self, seconds: float) -> datetime:
+        """Return an STS-style Expiration, seconds after the current fake time."""
+        return datetime.fromtimestamp(self.now + seconds, tz=timezone.utc)
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Replace the credentials handler clock with a FakeClock the test drives."""
+    clock = FakeClock()
+    monkeypatch.setattr(
+        credentials_handler,
+        "time",
+        SimpleNamespace(time=clock.time, monotonic=clock.time),
+    )
+    return clock
+
+
+@pytest.fixture
+def mock_boto3_client(monkeypatch):
+    """Replace boto3.client, which the handler uses to build STS clients."""
+    mock_client = MagicMock()
+    monkeypatch.setattr(boto3, "client", mock_client)
+    return mock_client
+
+
+@pytest.fixture
+def mock_boto3_session(monkeypatch):
+    """Replace boto3.Session, which the handler uses for IAM profiles."""
+    mock_session = MagicMock()
+    monkeypatch.setattr(boto3, "Session", mock_session)
+    return mock_session
+
+
+def _handler_config(
+    services=None, aws_defaults=None, refresh_buffer_seconds=300, retry_delay=60
+):
+    """Build a lightweight Config stand-in with only what the handler reads."""
+    return SimpleNamespace(
+        services=services if services is not None else {},
+        aws_defaults=aws_defaults,
+        credentials=SimpleNamespace(
+            refresh_buffer_seconds=refresh_buffer_seconds, retry_delay=retry_delay
+        ),
+    )
 
 
 class TestServiceCredentialsManager:
     """Test ServiceCredentialsManager class."""
 
-    def test_is_expired_false(self):
+    def test_is_expired_false(self, fake_clock):
         """Test is_expired returns False when not expired."""
-        future_time = time.time() + 3600  # 1 hour from now
         manager = ServiceCredentialsManager(
             aws_access_key_id="test",
             aws_secret_access_key="test",
             session_token="test",
-            expiry=future_time,
+            expiry=fake_clock.now + 3600,
         )
         assert manager.is_expired() is False
 
-    def test_is_expired_true(self):
+    def test_is_expired_true(self, fake_clock):
         """Test is_expired returns True when expired."""
-        past_time = time.time() - 3600  # 1 hour ago
         manager = ServiceCredentialsManager(
             aws_access_key_id="test",
             aws_secret_access_key="test",
             session_token="test",
-            expiry=past_time,
+            expiry=fake_clock.now + 3600,
         )
+        fake_clock.advance(3600)  # Expiry reached
         assert manager.is_expired() is True
 
-    def test_to_dict(self):
+    def test_is_expired_skew(self, fake_clock):
+        """Test is_expired returns True within the default expiry skew window."""
+        manager = ServiceCredentialsManager(
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            session_token="test",
+            expiry=fake_clock.now + 61,
+        )
+        assert manager.is_expired() is False
+
+        # Still 60s away from expiry, but inside the default 60s skew window
+        fake_clock.advance(1)
+        assert manager.is_expired() is True
+
+        manager.expiry_skew_seconds = 0
+        assert manager.is_expired() is False
+
+    def test_is_expired_ignores_wall_clock_jumps(self, fake_clock, monkeypatch):
+        """Test expiry is tracked on the monotonic clock once created."""
+        manager = ServiceCredentialsManager(
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            session_token="test",
+            expiry=fake_clock.now + 3600,
+        )
+
+        # System clock jumps two hours ahead, the monotonic clock does not move
+        monkeypatch.setattr(
+            credentials_handler,
+            "time",
+            SimpleNamespace(
+                time=lambda: fake_clock.now + 7200, monotonic=fake_clock.time
+            ),
+        )
+        assert manager.is_expired() is False
+
+    def test_to_dict(self, fake_clock):
         """Test to_dict conversion."""
-        expiry_time = time.time() + 3600
         manager = ServiceCredentialsManager(
             aws_access_key_id="TESTKEY",
             aws_secret_access_key="testsecret",
             session_token="testtoken",
-            expiry=expiry_time,
+            expiry=fake_clock.now + 3600,
         )
 
         result = manager.to_dict()
@@ -55,7 +164,11 @@ class TestServiceCredentialsManager:
         assert result["AccessKeyId"] == "TESTKEY"
         assert result["SecretAccessKey"] == "testsecret"
         assert result["Token"] == "testtoken"
-        assert "Expiration" in result
+        assert result["Expiration"] == fake_clock.expiration(3600).strftime(
+            "%Y-%m-%dT%H:%M:%S.%fZ"
+        )
+        # Built once and served as-is on every call
+        assert manager.to_dict() is result
 
 
 class TestCredentialsHandler:
@@ -63,8 +176,7 @@ class TestCredentialsHandler:
 
     def test_init_with_config(self):
         """Test CredentialsHandler initialization with config."""
-        mock_config = MagicMock()
-        mock_config.services = {}
+        mock_config = _handler_config()
 
         handler = CredentialsHandler(mock_config)
 
@@ -73,7 +185,7 @@ class TestCredentialsHandler:
 
     def test_cleanup_empty_cache(self):
         """Test cleanup with empty cache."""
-        mock_config = MagicMock()
+        mock_config = _handler_config()
         handler = CredentialsHandler(mock_config)
 
         handler.cleanup()
@@ -81,7 +193,7 @@ class TestCredentialsHandler:
 
     def test_cleanup_with_cache(self):
         """Test cleanup with cached credentials."""
-        mock_config = MagicMock()
+        mock_config = _handler_config()
         handler = CredentialsHandler(mock_config)
 
         # Add some cached credentials
@@ -91,20 +203,37 @@ class TestCredentialsHandler:
         handler.cleanup()
         assert handler.cache == {}
 
-    def test_get_credentials_cache_hit(self):
+    def test_cache_bounded(self, fake_clock):
+        """Test the cache evicts the oldest refreshed entries beyond its bound."""
+        handler = CredentialsHandler(_handler_config())
+
+        for index in range(1500):
+            handler._store_credentials(
+                f"service-{index}",
+                ServiceCredentialsManager(
+                    aws_access_key_id=f"KEY{index}",
+                    aws_secret_access_key="secret",
+                    session_token="token",
+                    expiry=fake_clock.now + 3600,
+                ),
+            )
+
+        assert len(handler.cache) == credentials_handler._CACHE_MAXSIZE
+        assert "service-0" not in handler.cache
+        assert "service-1499" in handler.cache
+
+    def test_get_credentials_cache_hit(self, fake_clock):
         """Test getting credentials from cache."""
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": MagicMock()}
+        mock_config = _handler_config({"test-service": SimpleNamespace()})
 
         handler = CredentialsHandler(mock_config)
 
         # Add non-expired cached credentials
-        future_time = time.time() + 3600
         cached_creds = ServiceCredentialsManager(
             aws_access_key_id="CACHEDKEY",
             aws_secret_access_key="cachedsecret",
             session_token="cachedtoken",
-            expiry=future_time,
+            expiry=fake_clock.now + 3600,
         )
         handler.cache["test-service"] = cached_creds
 
@@ -114,264 +243,553 @@ class TestCredentialsHandler:
         assert result["SecretAccessKey"] == "cachedsecret"
         assert result["Token"] == "cachedtoken"
 
-    def test_get_credentials_cache_miss(self):
+    def test_get_credentials_cache_miss(self, fake_clock, mock_boto3_session):
         """Test getting credentials when cache miss."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMProfileAuthConfig,
-            SourceCredentialsConfig,
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_profile=IAMProfileAuthConfig(profile_name="test-profile"),
+            ),
         )
 
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
-        )
-        mock_service.source_credentials = SourceCredentialsConfig(
-            region="us-west-2",
-            iam_profile=IAMProfileAuthConfig(profile_name="test-profile"),
+        mock_config = _handler_config(
+            {"test-service": mock_service},
+            aws_defaults=SimpleNamespace(region=None, iam_profile=None, iam_keys=None),
         )
 
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = MagicMock()
-        mock_config.aws_defaults.iam_profile = None
-
         handler = CredentialsHandler(mock_config)
 
-        with patch("boto3.Session") as mock_session:
-            mock_boto_session = MagicMock()
-            mock_session.return_value = mock_boto_session
+        mock_boto_session = MagicMock()
+        mock_boto3_session.return_value = mock_boto_session
 
-            mock_sts_client = MagicMock()
-            mock_sts_client.assume_role.return_value = {
-                "Credentials": {
-                    "AccessKeyId": "NEWKEY",
-                    "SecretAccessKey": "newsecret",
-                    "SessionToken": "newtoken",
-                    "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
-                }
+        mock_sts_client = MagicMock()
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(3600),
             }
-            mock_boto_session.client.return_value = mock_sts_client
+        }
+        mock_boto_session.client.return_value = mock_sts_client
 
-            result = handler.get_credentials("test-service")
+        result = handler.get_credentials("test-service")
 
-            assert result["AccessKeyId"] == "NEWKEY"
-            assert result["SecretAccessKey"] == "newsecret"
-            assert result["Token"] == "newtoken"
+        assert result["AccessKeyId"] == "NEWKEY"
+        assert result["SecretAccessKey"] == "newsecret"
+        assert result["Token"] == "newtoken"
 
-    def test_get_credentials_expired_cache(self):
-        """Test getting credentials when cached credentials are expired."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMKeysAuthConfig,
-            SourceCredentialsConfig,
-        )
+        # A later refresh reuses the STS client built for the first one
+        handler.cache.clear()
+        handler.get_credentials("test-service")
 
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
-        )
-        mock_service.source_credentials = SourceCredentialsConfig(
-            region="us-west-2",
-            iam_keys=IAMKeysAuthConfig(
-                aws_access_key_id="test-key",
-                aws_secret_access_key="test-secret",
+        mock_boto3_session.assert_called_once_with(profile_name="test-profile")
+        mock_boto_session.client.assert_called_once_with("sts", region_name="us-west-2")
+        assert mock_sts_client.assume_role.call_count == 2
+
+    def test_get_credentials_expired_cache(self, fake_clock, mock_boto3_client):
+        """Test getting credentials when cached credentials are expired."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
             ),
         )
 
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = None
+        mock_config = _handler_config({"test-service": mock_service})
 
         handler = CredentialsHandler(mock_config)
 
-        # Add expired cached credentials
-        past_time = time.time() - 3600
+        # Add cached credentials, then let them expire
         expired_creds = ServiceCredentialsManager(
             aws_access_key_id="EXPIREDKEY",
             aws_secret_access_key="expiredsecret",
             session_token="expiredtoken",
-            expiry=past_time,
+            expiry=fake_clock.now + 3600,
         )
         handler.cache["test-service"] = expired_creds
-
-        with patch("boto3.client") as mock_client:
-            mock_sts_client = MagicMock()
-            mock_sts_client.assume_role.return_value = {
-                "Credentials": {
-                    "AccessKeyId": "NEWKEY",
-                    "SecretAccessKey": "newsecret",
-                    "SessionToken": "newtoken",
-                    "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
-                }
+        fake_clock.advance(7200)
+
+        mock_sts_client = MagicMock()
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(3600),
             }
-            mock_client.return_value = mock_sts_client
+        }
+        mock_boto3_client.return_value = mock_sts_client
 
-            result = handler.get_credentials("test-service")
+        result = handler.get_credentials("test-service")
 
-            assert result["AccessKeyId"] == "NEWKEY"
-            assert result["SecretAccessKey"] == "newsecret"
-            assert result["Token"] == "newtoken"
+        assert result["AccessKeyId"] == "NEWKEY"
+        assert result["SecretAccessKey"] == "newsecret"
+        assert result["Token"] == "newtoken"
 
-    def test_assume_role_client_error(self):
-        """Test _assume_role with ClientError."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMKeysAuthConfig,
-            SourceCredentialsConfig,
-        )
+        # New credentials are refreshed refresh_buffer_seconds early
+        assert handler.cache["test-service"].expiry_skew_seconds == 300
 
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
+    def test_get_credentials_refresh_buffer_longer_than_session(
+        self, fake_clock, mock_boto3_client
+    ):
+        """Test a refresh buffer above the session duration still caches."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+                DurationSeconds=900,
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
+            ),
         )
-        mock_service.source_credentials = SourceCredentialsConfig(
-            region="us-west-2",
-            iam_keys=IAMKeysAuthConfig(
-                aws_access_key_id="test-key",
-                aws_secret_access_key="test-secret",
+        handler = CredentialsHandler(
+            _handler_config({"test-service": mock_service}, refresh_buffer_seconds=1200)
+        )
+
+        mock_sts_client = mock_boto3_client.return_value
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(900),
+            }
+        }
+
+        handler.get_credentials("test-service")
+        fake_clock.advance(60)
+        result = handler.get_credentials("test-service")
+
+        assert result["AccessKeyId"] == "NEWKEY"
+        assert mock_sts_client.assume_role.call_count == 1
+        # The skew is capped at half the credentials lifetime
+        assert handler.cache["test-service"].expiry_skew_seconds == 450
+
+    @pytest.mark.slow
+    def test_get_credentials_single_flight(self, fake_clock, mock_boto3_client):
+        """Test concurrent cache misses for a service trigger one AssumeRole."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
             ),
         )
 
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = None
+        mock_config = _handler_config({"test-service": mock_service})
 
         handler = CredentialsHandler(mock_config)
 
-        with patch("boto3.client") as mock_client:
-            mock_sts_client = MagicMock()
-            from botocore.exceptions import ClientError
+        def slow_assume_role(**kwargs):
+            # Keep the refresh in flight while the other callers arrive
+            time.sleep(0.05)
+            return {
+                "Credentials": {
+                    "AccessKeyId": "NEWKEY",
+                    "SecretAccessKey": "newsecret",
+                    "SessionToken": "newtoken",
+                    "Expiration": fake_clock.expiration(3600),
+                }
+            }
 
-            mock_sts_client.assume_role.side_effect = ClientError(
-                {"Error": {"Code": "AccessDenied", "Message": "Access denied"}},
-                "AssumeRole",
-            )
-            mock_client.return_value = mock_sts_client
+        mock_sts_client = mock_boto3_client.return_value
+        mock_sts_client.assume_role.side_effect = slow_assume_role
 
-            with pytest.raises(ClientError):
-                handler._assume_role(mock_service)
+        with ThreadPoolExecutor(16) as executor:
+            results = list(
+                executor.map(
+                    lambda _: handler.get_credentials("test-service"), range(16)
+                )
+            )
 
-    def test_assume_role_with_external_id(self):
-        """Test _assume_role with external_id."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMKeysAuthConfig,
-            SourceCredentialsConfig,
-        )
+        assert mock_sts_client.assume_role.call_count == 1
+        assert all(result["AccessKeyId"] == "NEWKEY" for result in results)
 
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
-            ExternalId="test-external-id",
-        )
-        mock_service.source_credentials = SourceCredentialsConfig(
-            region="us-west-2",
-            iam_keys=IAMKeysAuthConfig(
-                aws_access_key_id="test-key",
-                aws_secret_access_key="test-secret",
+    @pytest.mark.slow
+    def test_aget_credentials_concurrent(self, fake_clock, mock_boto3_client):
+        """Test concurrent async callers share a single AssumeRole."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
             ),
         )
 
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = None
+        handler = CredentialsHandler(_handler_config({"test-service": mock_service}))
+
+        def slow_assume_role(**kwargs):
+            time.sleep(0.05)
+            return {
+                "Credentials": {
+                    "AccessKeyId": "NEWKEY",
+                    "SecretAccessKey": "newsecret",
+                    "SessionToken": "newtoken",
+                    "Expiration": fake_clock.expiration(3600),
+                }
+            }
+
+        async def fetch_all():
+            return await asyncio.gather(
+                *(handler.aget_credentials("test-service") for _ in range(50))
+            )
+
+        mock_sts_client = mock_boto3_client.return_value
+        mock_sts_client.assume_role.side_effect = slow_assume_role
+
+        results = asyncio.run(fetch_all())
+
+        assert mock_sts_client.assume_role.call_count == 1
+        assert all(result["AccessKeyId"] == "NEWKEY" for result in results)
+
+    @pytest.mark.slow
+    def test_prefetch_all_parallel(self, fake_clock, mock_boto3_client):
+        """Test prefetch_all dispatches AssumeRole calls concurrently."""
+        services = {}
+        for index in range(20):
+            service = SimpleNamespace(
+                assumed_role=AssumedRoleConfig(
+                    RoleArn=f"arn:aws:iam::123456789012:role/TestRole{index}",
+                    RoleSessionName="test-session",
+                ),
+                source_credentials=SourceCredentialsConfig(
+                    region="us-west-2",
+                    iam_keys=IAMKeysAuthConfig(
+                        aws_access_key_id="test-key",
+                        aws_secret_access_key="test-secret",
+                    ),
+                ),
+            )
+            services[f"service-{index}"] = service
+
+        mock_config = _handler_config(services)
 
         handler = CredentialsHandler(mock_config)
 
-        with patch("boto3.client") as mock_client:
-            mock_sts_client = MagicMock()
-            mock_sts_client.assume_role.return_value = {
+        # Only releases once 10 calls are in flight at the same time: serial
+        # calls would time out and fail their prefetch
+        in_flight = threading.Barrier(10, timeout=5)
+
+        def concurrent_assume_role(**kwargs):
+            in_flight.wait()
+            return {
                 "Credentials": {
                     "AccessKeyId": "NEWKEY",
                     "SecretAccessKey": "newsecret",
                     "SessionToken": "newtoken",
-                    "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
+                    "Expiration": fake_clock.expiration(3600),
                 }
             }
-            mock_client.return_value = mock_sts_client
 
-            result = handler._assume_role(mock_service)
+        mock_boto3_client.return_value.assume_role.side_effect = concurrent_assume_role
+
+        prefetched = handler.prefetch_all(max_workers=10)
 
-            # Verify assume_role was called with external_id
-            mock_sts_client.assume_role.assert_called_once_with(
+        assert prefetched == 20
+        assert sorted(handler.cache) == sorted(services)
+
+    def test_assume_role_client_error(self, mock_boto3_client):
+        """Test _assume_role with ClientError."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
                 RoleArn="arn:aws:iam::123456789012:role/TestRole",
                 RoleSessionName="test-session",
-                DurationSeconds=900,  # Default value
-                ExternalId="test-external-id",
-            )
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
+            ),
+        )
 
-            assert result["AccessKeyId"] == "NEWKEY"
-            assert result["SecretAccessKey"] == "newsecret"
-            assert result["SessionToken"] == "newtoken"
+        mock_config = _handler_config({"test-service": mock_service})
 
-    def test_assume_role_without_external_id(self):
-        """Test _assume_role without external_id."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMKeysAuthConfig,
-            SourceCredentialsConfig,
+        handler = CredentialsHandler(mock_config)
+
+        mock_sts_client = MagicMock()
+        mock_sts_client.assume_role.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied", "Message": "Access denied"}},
+            "AssumeRole",
         )
+        mock_boto3_client.return_value = mock_sts_client
 
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
+        with pytest.raises(ClientError):
+            handler._assume_role(mock_service)
+
+    def test_get_credentials_negative_cache(self, fake_clock, mock_boto3_client):
+        """Test a failed refresh is replayed without calling STS until retry_delay."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
+            ),
+        )
+
+        handler = CredentialsHandler(
+            _handler_config({"test-service": mock_service}, retry_delay=1)
         )
-        mock_service.source_credentials = SourceCredentialsConfig(
+
+        mock_sts_client = mock_boto3_client.return_value
+        mock_sts_client.assume_role.side_effect = ClientError(
+            {"Error": {"Code": "Throttling", "Message": "Rate exceeded"}},
+            "AssumeRole",
+        )
+
+        with pytest.raises(ClientError, match="Throttling"):
+            handler.get_credentials("test-service")
+        for _ in range(10):
+            fake_clock.advance(0.05)
+            with pytest.raises(RefreshBackoffError, match="Throttling") as excinfo:
+                handler.get_credentials("test-service")
+            assert isinstance(excinfo.value.__cause__, ClientError)
+
+        assert mock_sts_client.assume_role.call_count == 1
+
+        # Once the retry delay has passed, STS is called again
+        fake_clock.advance(1)
+        mock_sts_client.assume_role.side_effect = None
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(3600),
+            }
+        }
+
+        result = handler.get_credentials("test-service")
+
+        assert mock_sts_client.assume_role.call_count == 2
+        assert result["AccessKeyId"] == "NEWKEY"
+        assert handler._errors == {}
+
+    def test_get_credentials_negative_cache_config_replaced(
+        self, fake_clock, mock_boto3_client
+    ):
+        """Test a replaced service config is tried at once despite a recent failure."""
+        source_credentials = SourceCredentialsConfig(
             region="us-west-2",
             iam_keys=IAMKeysAuthConfig(
                 aws_access_key_id="test-key",
                 aws_secret_access_key="test-secret",
             ),
         )
+        broken_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/WrongRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=source_credentials,
+        )
+        config = _handler_config({"test-service": broken_service})
+        handler = CredentialsHandler(config)
 
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = None
-
-        handler = CredentialsHandler(mock_config)
+        mock_sts_client = mock_boto3_client.return_value
+        mock_sts_client.assume_role.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied", "Message": "Not authorized"}},
+            "AssumeRole",
+        )
+        with pytest.raises(ClientError, match="AccessDenied"):
+            handler.get_credentials("test-service")
 
-        with patch("boto3.client") as mock_client:
-            mock_sts_client = MagicMock()
-            mock_sts_client.assume_role.return_value = {
-                "Credentials": {
-                    "AccessKeyId": "NEWKEY",
-                    "SecretAccessKey": "newsecret",
-                    "SessionToken": "newtoken",
-                    "Expiration": datetime.now(timezone.utc) + timedelta(hours=1),
-                }
+        # Fixed service definition, e.g. reloaded by the file watcher
+        config.services["test-service"] = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
+                RoleArn="arn:aws:iam::123456789012:role/TestRole",
+                RoleSessionName="test-session",
+            ),
+            source_credentials=source_credentials,
+        )
+        mock_sts_client.assume_role.side_effect = None
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(3600),
             }
-            mock_client.return_value = mock_sts_client
+        }
+
+        result = handler.get_credentials("test-service")
+
+        assert mock_sts_client.assume_role.call_count == 2
+        assert result["AccessKeyId"] == "NEWKEY"
+
+    def test_forget_removed_services(self):
+        """Test refresh state of removed services is dropped by the cleanup."""
+        config = _handler_config({"kept": SimpleNamespace()})
+        handler = CredentialsHandler(config)
+        handler._refresh_locks = {"kept": Mock(), "removed": Mock()}
+        handler._errors = {
+            "kept": (0.0, None, Exception()),
+            "removed": (0.0, None, Exception()),
+        }
+
+        with handler._cache_lock:
+            handler._forget_removed_services()
 
-            result = handler._assume_role(mock_service)
+        assert list(handler._refresh_locks) == ["kept"]
+        assert list(handler._errors) == ["kept"]
+        handler.cleanup()
 
-            # Verify assume_role was called without external_id
-            mock_sts_client.assume_role.assert_called_once_with(
+    @pytest.mark.parametrize(
+        "role_kwargs, expected_kwargs",
+        [
+            ({}, {"DurationSeconds": 900}),
+            (
+                {"ExternalId": "test-external-id"},
+                {"DurationSeconds": 900, "ExternalId": "test-external-id"},
+            ),
+            ({"DurationSeconds": 1800}, {"DurationSeconds": 1800}),
+        ],
+        ids=["defaults", "external_id", "duration_seconds"],
+    )
+    def test_assume_role_parameters(
+        self, fake_clock, role_kwargs, expected_kwargs, mock_boto3_client
+    ):
+        """Test _assume_role passes only the configured AssumeRole parameters."""
+        mock_service = SimpleNamespace(
+            assumed_role=AssumedRoleConfig(
                 RoleArn="arn:aws:iam::123456789012:role/TestRole",
                 RoleSessionName="test-session",
-                DurationSeconds=900,  # Default value
+                **role_kwargs,
+            ),
+            source_credentials=SourceCredentialsConfig(
+                region="us-west-2",
+                iam_keys=IAMKeysAuthConfig(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                ),
+            ),
+        )
+
+        mock_config = _handler_config({"test-service": mock_service})
+
+        handler = CredentialsHandler(mock_config)
+
+        mock_sts_client = MagicMock()
+        mock_sts_client.assume_role.return_value = {
+            "Credentials": {
+                "AccessKeyId": "NEWKEY",
+                "SecretAccessKey": "newsecret",
+                "SessionToken": "newtoken",
+                "Expiration": fake_clock.expiration(expected_kwargs["DurationSeconds"]),
+            }
+        }
+        mock_boto3_client.return_value = mock_sts_client
+
+        result = handler._assume_role(mock_service)
+
+        # None-valued role settings are left out of the API call
+        mock_sts_client.assume_role.assert_called_once_with(
+            RoleArn="arn:aws:iam::123456789012:role/TestRole",
+            RoleSessionName="test-session",
+            **expected_kwargs,
+        )
+
+        assert result["AccessKeyId"] == "NEWKEY"
+        assert result["SecretAccessKey"] == "newsecret"
+        assert result["SessionToken"] == "newtoken"
+
+        # The parameters are built once per service config and then reused
+        assume_role_params = handler._get_assume_role_params(mock_service)
+        assert assume_role_params == {
+            "RoleArn": "arn:aws:iam::123456789012:role/TestRole",
+            "RoleSessionName": "test-session",
+            **expected_kwargs,
+        }
+        assert handler._get_assume_role_params(mock_service) is assume_role_params
+
+    def test_assume_role_shares_sts_client_per_source_credentials(
+        self, mock_boto3_client
+    ):
+        """Test services with the same source credentials share one STS client."""
+
+        def make_service(role_name, access_key_id):
+            service = SimpleNamespace(
+                assumed_role=AssumedRoleConfig(
+                    RoleArn=f"arn:aws:iam::123456789012:role/{role_name}",
+                    RoleSessionName="test-session",
+                ),
+                source_credentials=SourceCredentialsConfig(
+                    region="us-west-2",
+                    iam_keys=IAMKeysAuthConfig(
+                        aws_access_key_id=access_key_id,
+                        aws_secret_access_key="test-secret",
+                    ),
+                ),
             )
+            return service
 
-            assert result["AccessKeyId"] == "NEWKEY"
-            assert result["SecretAccessKey"] == "newsecret"
-            assert result["SessionToken"] == "newtoken"
+        service_a = make_service("RoleA", "test-key")
+        service_b = make_service("RoleB", "test-key")
+        service_c = make_service("RoleC", "other-key")
+
+        mock_config = _handler_config({"a": service_a, "b": service_b, "c": service_c})
+
+        handler = CredentialsHandler(mock_config)
+
+        for service in (service_a, service_b, service_c, service_a):
+            handler._assume_role(service)
+
+        # One client for test-key, shared by RoleA and RoleB, one for other-key
+        assert mock_boto3_client.call_count == 2
+        assert mock_boto3_client.return_value.assume_role.call_count == 4
+
+        handler.cleanup()
+        assert handler._sts_clients == {}
 
     def test_get_aws_config_iam_profile(self):
         """Test _get_aws_config with IAM profile."""
-        mock_service = MagicMock()
-        mock_service.source_credentials.iam_profile.profile_name = "test-profile"
-        mock_service.source_credentials.region = "us-west-2"
-        mock_service.source_credentials.iam_keys = None
+        mock_service = SimpleNamespace(
+            source_credentials=SimpleNamespace(
+                region="us-west-2",
+                iam_profile=SimpleNamespace(profile_name="test-profile"),
+                iam_keys=None,
+            )
+        )
 
-        mock_config = MagicMock()
-        mock_config.aws_defaults = MagicMock()
-        mock_config.aws_defaults.iam_profile = None
-        mock_config.aws_defaults.iam_keys = None
+        mock_config = _handler_config(
+            aws_defaults=SimpleNamespace(region=None, iam_profile=None, iam_keys=None)
+        )
 
         handler = CredentialsHandler(mock_config)
 
@@ -382,17 +800,21 @@ class TestCredentialsHandler:
 
     def test_get_aws_config_iam_keys(self):
         """Test _get_aws_config with IAM keys."""
-        mock_service = MagicMock()
-        mock_service.source_credentials.iam_keys.aws_access_key_id = "test-key"
-        mock_service.source_credentials.iam_keys.aws_secret_access_key = "test-secret"
-        mock_service.source_credentials.iam_keys.session_token = "test-token"
-        mock_service.source_credentials.region = "us-west-2"
-        mock_service.source_credentials.iam_profile = None
-
-        mock_config = MagicMock()
-        mock_config.aws_defaults = MagicMock()
-        mock_config.aws_defaults.iam_profile = None
-        mock_config.aws_defaults.iam_keys = None
+        mock_service = SimpleNamespace(
+            source_credentials=SimpleNamespace(
+                region="us-west-2",
+                iam_profile=None,
+                iam_keys=SimpleNamespace(
+                    aws_access_key_id="test-key",
+                    aws_secret_access_key="test-secret",
+                    session_token="test-token",
+                ),
+            )
+        )
+
+        mock_config = _handler_config(
+            aws_defaults=SimpleNamespace(region=None, iam_profile=None, iam_keys=None)
+        )
 
         handler = CredentialsHandler(mock_config)
 
@@ -408,18 +830,20 @@ class TestCredentialsHandler:
 
     def test_get_aws_config_fallback_to_defaults(self):
         """Test _get_aws_config falls back to defaults."""
-        mock_service = MagicMock()
-        mock_service.source_credentials = None  # No service-specific AWS config
-
-        mock_default_aws = MagicMock()
-        mock_default_aws.iam_keys.aws_access_key_id = "default-key"
-        mock_default_aws.iam_keys.aws_secret_access_key = "default-secret"
-        mock_default_aws.iam_keys.session_token = None  # Explicitly set to None
-        mock_default_aws.region = "us-east-1"
-        mock_default_aws.iam_profile = None
+        # No service-specific AWS config
+        mock_service = SimpleNamespace(source_credentials=None)
+
+        mock_default_aws = SimpleNamespace(
+            region="us-east-1",
+            iam_profile=None,
+            iam_keys=SimpleNamespace(
+                aws_access_key_id="default-key",
+                aws_secret_access_key="default-secret",
+                session_token=None,  # Explicitly set to None
+            ),
+        )
 
-        mock_config = MagicMock()
-        mock_config.aws_defaults = mock_default_aws
+        mock_config = _handler_config(aws_defaults=mock_default_aws)
 
         handler = CredentialsHandler(mock_config)
 
@@ -432,15 +856,48 @@ class TestCredentialsHandler:
         }
         assert result == expected
 
+    def test_get_aws_config_memoized(self):
+        """Test _get_aws_config computes the config once per service config."""
+        mock_service = SimpleNamespace(
+            source_credentials=SimpleNamespace(
+                region="us-west-2", iam_profile=None, iam_keys=None
+            )
+        )
+        handler = CredentialsHandler(_handler_config({"test-service": mock_service}))
+
+        with patch.object(
+            handler, "_compute_aws_config", wraps=handler._compute_aws_config
+        ) as compute:
+            for _ in range(100):
+                result = handler._get_aws_config(mock_service)
+
+            assert compute.call_count == 1
+            assert result == {"region_name": "us-west-2"}
+
+            # An updated service is a new config object and is resolved again
+            updated_service = SimpleNamespace(
+                source_credentials=SimpleNamespace(
+                    region="eu-west-1", iam_profile=None, iam_keys=None
+                )
+            )
+            handler.config.services["test-service"] = updated_service
+            assert handler._get_aws_config(updated_service) == {
+                "region_name": "eu-west-1"
+            }
+            assert compute.call_count == 2
+
+        # The replaced service's entry is dropped
+        assert list(handler._aws_configs) == [id(updated_service)]
+
     def test_get_aws_config_default_auth_method(self):
         """Test _get_aws_config with default auth method."""
-        mock_service = MagicMock()
-        mock_service.source_credentials.iam_keys = None
-        mock_service.source_credentials.iam_profile = None
-        mock_service.source_credentials.region = "us-west-2"
+        mock_service = SimpleNamespace(
+            source_credentials=SimpleNamespace(
+                region="us-west-2", iam_profile=None, iam_keys=None
+            )
+        )
 
-        mock_config = MagicMock()
-        mock_config.aws_defaults = None
+        mock_config = _handler_config()
 
         handler = CredentialsHandler(mock_config)
 
@@ -448,55 +905,3 @@ class TestCredentialsHandler:
 
         expected = {"region_name": "us-west-2"}
         assert result == expected
-
-    def test_assume_role_with_DurationSeconds(self):
-        """Test _assume_role with custom DurationSeconds."""
-        from credproxy.config import (
-            AssumedRoleConfig,
-            IAMKeysAuthConfig,
-            SourceCredentialsConfig,
-        )
-
-        mock_service = MagicMock()
-        mock_service.assumed_role = AssumedRoleConfig(
-            RoleArn="arn:aws:iam::123456789012:role/TestRole",
-            RoleSessionName="test-session",
-            DurationSeconds=1800,  # 30 minutes
-        )
-        mock_service.source_credentials = SourceCredentialsConfig(
-            region="us-west-2",
-            iam_keys=IAMKeysAuthConfig(
-                aws_access_key_id="test-key", aws_secret_access_key="test-secret"
-            ),
-        )
-
-        mock_config = MagicMock()
-        mock_config.services = {"test-service": mock_service}
-        mock_config.aws_defaults = None
-
-        handler = CredentialsHandler(mock_config)
-
-        with patch("boto3.client") as mock_client:
-            mock_sts_client = MagicMock()
-            mock_sts_client.assume_role.return_value = {
-                "Credentials": {
-                    "AccessKeyId": "NEWKEY",
-                    "SecretAccessKey": "newsecret",
-                    "SessionToken": "newtoken",
-                    "Expiration": datetime.now(timezone.utc) + timedelta(minutes=30),
-                }
-            }
-            mock_client.return_value = mock_sts_client
-
-            result = handler._assume_role(mock_service)
-
-            # Verify assume_role was called with custom duration
-            mock_sts_client.assume_role.assert_called_once_with(
-                RoleArn="arn:aws:iam::123456789012:role/TestRole",
-                RoleSessionName="test-session",
-                DurationSeconds=1800,
-            )
-
-            assert result["AccessKeyId"] == "NEWKEY"
-            assert result["SecretAccessKey"] == "newsecret"
-            assert result["SessionToken"] == "newtoken"
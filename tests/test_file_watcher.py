@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
-import os
+import sys
 import time
 import tempfile
+import threading
+from uuid import uuid4
+from types import SimpleNamespace
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -18,105 +21,170 @@ from credproxy.config import (
     AssumedRoleConfig,
     SourceCredentialsConfig,
 )
-from credproxy.file_watcher import FileWatcherService, ServiceFileHandler
+from tests.yaml_helpers import Dumper
+from credproxy.file_watcher import (
+    Observer,
+    FileWatcherService,
+    ServiceFileHandler,
+    _resolve_cached,
+)
+
+
+_MOCK_ACCESS_KEY = mock_access_key_id()
+_MOCK_SECRET_KEY = mock_secret_access_key()
+_MOCK_ROLE = mock_role_arn()
+
+_SERVICE_NAME = "test-service"
+# Serialized once: the service file content is the same in every test
+_VALID_SERVICE_YAML = yaml.dump(
+    {
+        "services": {
+            _SERVICE_NAME: {
+                "auth_token": "test-token-123",
+                "source_credentials": {
+                    "region": "us-east-1",
+                    "iam_keys": {
+                        "aws_access_key_id": _MOCK_ACCESS_KEY,
+                        "aws_secret_access_key": _MOCK_SECRET_KEY,
+                    },
+                },
+                "assumed_role": {
+                    "RoleArn": "arn:aws:iam::123456789012:role/TestRole",
+                    "RoleSessionName": "test-session",
+                    "DurationSeconds": 3600,
+                },
+            }
+        }
+    },
+    Dumper=Dumper,
+)
+
+# Real observers and drain threads: fail rather than hang
+pytestmark = pytest.mark.timeout(10)
+
+
+@pytest.fixture(scope="module")
+def tmpdir_shared(tmp_path_factory):
+    """Directory shared by the tests of this module, removed by pytest."""
+    return tmp_path_factory.mktemp("fw")
+
+
+@pytest.fixture
+def base_config(tmp_path):
+    """Minimal configuration with dynamic services enabled on one directory.
+
+    The directory is not created, so starting the watcher exercises mkdir.
+    """
+    return SimpleNamespace(
+        services={},
+        aws_defaults=None,
+        dynamic_services=SimpleNamespace(
+            enabled=True,
+            directories=[
+                DirectoryConfig(
+                    path=str(tmp_path / "services"),
+                    include_patterns=[".*\\.yaml$"],
+                    exclude_patterns=[".*\\.tmp$"],
+                )
+            ],
+            reload_interval=5,
+        ),
+    )
+
+
+def _wait_until(condition, processed, timeout=5.0):
+    """Wait on the watcher post-process event until condition holds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        remaining = deadline - time.monotonic()
+        assert remaining > 0 and processed.wait(remaining), (
+            "Timed out waiting for the file watcher"
+        )
+        processed.clear()
 
 
 class TestServiceFileHandler:
     """Test service file handler for dynamic services."""
 
-    def test_init_with_valid_config(self):
+    def test_init_with_valid_config(self, base_config):
         """Test handler initialization with valid configuration."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.directories = [
-            DirectoryConfig(
-                path="/tmp/test",
-                include_patterns=[".*\\.yaml$"],
-                exclude_patterns=[".*\\.tmp$"],
-            )
-        ]
-        config.dynamic_services.include_patterns = [".*\\.yaml$"]
-        config.dynamic_services.exclude_patterns = [".*\\.tmp$"]
-        config.dynamic_services.reload_interval = 5
-
-        handler = ServiceFileHandler(config, 5)
+        handler = ServiceFileHandler(base_config, 5)
 
-        assert handler.config == config
+        assert handler.config == base_config
         assert handler.reload_interval == 5
 
-    def test_on_created_valid_yaml_file(self):
+    def test_on_created_valid_yaml_file(self, base_config, tmpdir_shared):
         """Test handling of valid YAML file creation."""
-        from credproxy.config import DirectoryConfig
-
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.directories = [
-            DirectoryConfig(
-                path="/tmp/test", include_patterns=[".*\\.yaml$"], exclude_patterns=[]
-            )
-        ]
-        config.dynamic_services.reload_interval = 5
-
-        # Create valid YAML content
-        config_content = {
-            "services": {
-                "new-service": {
-                    "auth_token": "new-token",
-                    "source_credentials": {
-                        "iam_profile": {"profile_name": "test", "region": "us-east-1"}
-                    },
-                    "assumed_role": {"RoleArn": mock_role_arn()},
-                    "source_file": "/test/new_service.yaml",
-                }
-            }
-        }
+        (tmpdir_shared / f"{uuid4().hex}.yaml").write_text(_VALID_SERVICE_YAML)
+
+        # Start the service
+        service = FileWatcherService(base_config)
+        service.start()
+
+        # Verify service is running
+        assert service.is_running()
+
+        # Stop the service
+        service.stop()
+
+        # Verify service is no longer running
+        assert not service.is_running()
+
+    @pytest.mark.parametrize(
+        "target, error",
+        [
+            ("credproxy.file_watcher.Observer", Exception("Observer error")),
+            ("pathlib.Path.mkdir", OSError("Permission denied")),
+            ("credproxy.file_watcher.Observer.schedule", Exception("Schedule error")),
+            ("credproxy.file_watcher.Observer.start", Exception("Start error")),
+        ],
+    )
+    def test_error_handling_in_start(self, base_config, target, error):
+        """Test that errors while starting the service are logged and re-raised."""
+        service = FileWatcherService(base_config)
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_content, f)
+        with (
+            patch(target, side_effect=error),
+            patch.object(service, "_load_existing_files"),
+        ):
+            with pytest.raises(type(error), match=str(error)):
+                service.start()
 
-            # Start the service
-            service = FileWatcherService(config)
-            service.start()
+    @pytest.mark.skipif(sys.platform != "linux", reason="inotify is Linux only")
+    def test_observer_uses_inotify(self):
+        """Test that events come from inotify rather than polling on Linux."""
+        from watchdog.observers.inotify import InotifyObserver
 
-            # Give it a moment to process
-            time.sleep(0.1)
+        assert Observer is InotifyObserver
 
-            # Verify service is running
-            assert service.is_running()
+    @pytest.mark.skipif(sys.platform != "linux", reason="inotify is Linux only")
+    def test_observer_ignores_open_and_close_events(self, base_config):
+        """Test the inotify watches leave out events the handler never uses."""
+        from watchdog.observers.inotify_c import InotifyConstants
 
-            # Stop the service
+        service = FileWatcherService(base_config)
+        with patch.object(service, "_load_existing_files"):
+            service.start()
+        try:
+            (emitter,) = service.observer.emitters
+            event_mask = emitter.get_event_mask_from_filter()
+        finally:
             service.stop()
 
-            # Verify service is no longer running
-            assert not service.is_running()
-
-    def test_error_handling_in_start(self):
-        """Test error handling during service start."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.enabled = True
-        config.dynamic_services.directories = ["/tmp/test"]
-        config.dynamic_services.include_patterns = []
-        config.dynamic_services.exclude_patterns = []
-
-        with patch(
-            "credproxy.file_watcher.Observer", side_effect=Exception("Observer error")
-        ):
-            service = FileWatcherService(config)
-
-            with pytest.raises(Exception):
-                service.start()
+        assert event_mask & InotifyConstants.IN_CREATE
+        assert event_mask & InotifyConstants.IN_MODIFY
+        assert event_mask & InotifyConstants.IN_DELETE
+        assert not event_mask & InotifyConstants.IN_OPEN
+        assert not event_mask & InotifyConstants.IN_CLOSE_NOWRITE
 
-    def test_error_handling_in_stop(self):
+    def test_error_handling_in_stop(self, base_config):
         """Test error handling during service stop."""
-        config = Mock()
-
         with patch("credproxy.file_watcher.Observer") as mock_observer_class:
             mock_observer = Mock()
             mock_observer.stop.side_effect = Exception("Stop error")
             mock_observer_class.return_value = mock_observer
 
-            service = FileWatcherService(config)
+            service = FileWatcherService(base_config)
             service.observer = mock_observer
             service._running = True
 
@@ -127,13 +195,12 @@ class TestServiceFileHandler:
             # because _running = False is in the try block
             assert service._running is True
 
-    def test_process_pending_changes_with_error(self):
+    def test_process_pending_changes_with_error(self, base_config):
         """Test error handling in _process_pending_changes."""
-        config = Mock()
-        handler = ServiceFileHandler(config, 5)
+        handler = ServiceFileHandler(base_config, 5)
 
         # Add a pending change
-        handler._pending_changes = {"test_file.yaml": time.time()}
+        handler._pending_changes = {"test_file.yaml": 1}
 
         # Mock _process_file_change to raise exception
         with patch.object(
@@ -143,135 +210,76 @@ class TestServiceFileHandler:
             handler._process_pending_changes()
 
             # Pending changes should be cleared even after error
-            assert len(handler._pending_changes) == 0
+            assert handler._pending_changes == {}
 
-    def test_process_file_change_invalid_yaml(self):
+    def test_process_file_change_invalid_yaml(self, base_config, tmpdir_shared):
         """Test processing file with invalid YAML content."""
-        config = Mock()
+        config = base_config
         config.add_dynamic_services = Mock()
         config.remove_dynamic_services = Mock()
 
         handler = ServiceFileHandler(config, 5)
 
         # Create a temporary file with invalid YAML
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write("invalid: yaml: content: [")
-            invalid_file = f.name
+        invalid_file = tmpdir_shared / f"{uuid4().hex}.yaml"
+        invalid_file.write_text("invalid: yaml: content: [")
 
-        try:
-            # Should handle invalid YAML gracefully
-            handler._process_file_change(invalid_file)
-        finally:
-            os.unlink(invalid_file)
+        # Should handle invalid YAML gracefully
+        handler._process_file_change(str(invalid_file))
 
         # Should not have added any services
         config.add_dynamic_services.assert_not_called()
 
-    def test_process_file_change_empty_file(self):
+    def test_process_file_change_empty_file(self, base_config, tmpdir_shared):
         """Test processing empty file."""
-        config = Mock()
+        config = base_config
         config.add_dynamic_services = Mock()
         config.remove_dynamic_services = Mock()
 
         handler = ServiceFileHandler(config, 5)
 
         # Create a temporary empty file
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write("")
-            empty_file = f.name
+        empty_file = tmpdir_shared / f"{uuid4().hex}.yaml"
+        empty_file.write_text("")
 
-        try:
-            # Should handle empty file gracefully
-            handler._process_file_change(empty_file)
-        finally:
-            os.unlink(empty_file)
+        # Should handle empty file gracefully
+        handler._process_file_change(str(empty_file))
 
         # Should not have added any services
         config.add_dynamic_services.assert_not_called()
 
-    def test_load_existing_files_permission_error(self):
+    def test_load_existing_files_permission_error(self, base_config):
         """Test handling permission errors when loading existing files."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.enabled = True
-        config.dynamic_services.directories = [
+        base_config.dynamic_services.directories = [
             DirectoryConfig(path="/root/nonexistent")  # Permission denied path
         ]
-        config.dynamic_services.include_patterns = []
-        config.dynamic_services.exclude_patterns = []
 
-        service = FileWatcherService(config)
+        service = FileWatcherService(base_config)
 
         # Should handle permission error gracefully
         service._load_existing_files()
 
         # Should not crash, just log error
 
-    def test_start_service_directory_creation_error(self):
-        """Test error handling when directory creation fails during start."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.enabled = True
-        config.dynamic_services.directories = [
-            DirectoryConfig(path="/tmp/nonexistent_test_dir")
-        ]
-        config.dynamic_services.include_patterns = []
-        config.dynamic_services.exclude_patterns = []
-
-        service = FileWatcherService(config)
-
-        # Mock Path.mkdir to raise exception
-        with patch.object(Path, "mkdir", side_effect=OSError("Permission denied")):
-            with patch.object(service, "_load_existing_files"):
-                # Should handle directory creation error gracefully - will raise and log
-                with pytest.raises(OSError):
-                    service.start()
-
-    def test_start_service_observer_schedule_error(self):
-        """Test error handling when observer scheduling fails."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.enabled = True
-        config.dynamic_services.directories = ["/tmp/test"]
-        config.dynamic_services.include_patterns = []
-        config.dynamic_services.exclude_patterns = []
-
-        service = FileWatcherService(config)
-
-        # Mock observer to raise exception during schedule
-        with patch("credproxy.file_watcher.Observer") as mock_observer_class:
-            mock_observer = Mock()
-            mock_observer.schedule.side_effect = Exception("Schedule error")
-            mock_observer_class.return_value = mock_observer
-
-            # Should handle schedule error gracefully - will raise and log
-            with pytest.raises(Exception):
-                service.start()
-
-    def test_start_service_observer_start_error(self):
-        """Test error handling when observer start fails."""
-        config = Mock()
-        config.dynamic_services = Mock()
-        config.dynamic_services.enabled = True
-        config.dynamic_services.directories = ["/tmp/test"]
-        config.dynamic_services.include_patterns = []
-        config.dynamic_services.exclude_patterns = []
-
-        service = FileWatcherService(config)
+    def test_load_existing_files_filters_entries(self, base_config):
+        """Test only matching regular files are loaded at startup."""
+        directory = Path(base_config.dynamic_services.directories[0].path)
+        directory.mkdir()
+        (directory / "service.yaml").write_text("services: {}")
+        (directory / "service.tmp").write_text("services: {}")
+        (directory / "nested.yaml").mkdir()
 
-        # Mock observer to raise exception during start
-        with patch("credproxy.file_watcher.Observer") as mock_observer_class:
-            mock_observer = Mock()
-            mock_observer.start.side_effect = Exception("Start error")
-            mock_observer_class.return_value = mock_observer
+        service = FileWatcherService(base_config)
+        service.handler = Mock()
+        service._load_existing_files()
 
-            # Should handle start error gracefully - will raise and log
-            with pytest.raises(Exception):
-                service.start()
+        service.handler._process_file_change.assert_called_once_with(
+            str(directory / "service.yaml")
+        )
 
-    def test_load_service_file_with_exception(self):
+    def test_load_service_file_with_exception(self, base_config):
         """Test _load_service_file with various exception scenarios."""
-        config = Mock()
+        config = base_config
         config.add_dynamic_services = Mock()
         config.remove_dynamic_services = Mock()
 
@@ -283,9 +291,9 @@ class TestServiceFileHandler:
         # Should return None for non-existent file
         assert result is None
 
-    def test_process_file_change_service_loading_error(self):
+    def test_process_file_change_service_loading_error(self, base_config):
         """Test _process_file_change when service loading fails."""
-        config = Mock()
+        config = base_config
         config.add_dynamic_services = Mock()
         config.remove_dynamic_services = Mock()
 
@@ -298,60 +306,128 @@ class TestServiceFileHandler:
             # Should handle loading error gracefully
             handler._process_file_change("/test/file.yaml")
 
-    def test_schedule_reload_timer_error(self):
-        """Test _schedule_reload when timer creation fails."""
-        config = Mock()
-        handler = ServiceFileHandler(config, 5)
+    def test_schedule_reload_drain_thread_error(self, base_config):
+        """Test _schedule_reload when the drain thread cannot be created."""
+        handler = ServiceFileHandler(base_config, 5)
 
-        # Mock timer to raise exception during creation
-        with patch("threading.Timer", side_effect=Exception("Timer error")):
-            # Should handle timer error gracefully - will raise exception
-            with pytest.raises(Exception, match="Timer error"):
+        # Mock thread creation to raise an exception
+        with patch("threading.Thread", side_effect=Exception("Thread error")):
+            # Should not be swallowed - will raise exception
+            with pytest.raises(Exception, match="Thread error"):
                 handler._schedule_reload("/test/file.yaml", "created")
 
 
 class TestFileWatcherAdvancedCoverage:
     """Advanced tests for file watcher coverage improvement."""
 
-    def test_schedule_reload_timer_cancellation(self):
-        """Test timer cancellation when scheduling reload (line 82)."""
-        config = Mock()
-        handler = ServiceFileHandler(config, 5)
-
-        # Create an existing timer
-        existing_timer = Mock()
-        handler._debounce_timer = existing_timer
+    def test_schedule_reload_drain_thread_idempotent(self, base_config):
+        """Test scheduling reloads reuses a single drain thread."""
+        handler = ServiceFileHandler(base_config, 5)
 
-        # Schedule new reload - should cancel existing timer
+        # First change starts the drain thread
         handler._schedule_reload("/test/file.yaml", "created")
+        drain_thread = handler._drain_thread
+        assert drain_thread is not None
+        assert drain_thread.is_alive()
+
+        # Further changes and explicit starts keep the same thread
+        handler._schedule_reload("/test/file.yaml", "modified")
+        handler.start_drain()
+        assert handler._drain_thread is drain_thread
+
+        handler.stop_drain()
+        assert not drain_thread.is_alive()
+        assert handler._drain_thread is None
+
+    def test_stop_leaves_no_drain_thread_behind(self, base_config):
+        """Test events dispatched while stopping do not restart the drain thread."""
+        service = FileWatcherService(base_config)
+        with patch.object(service, "_load_existing_files"):
+            service.start()
+        handler = service.handler
+        drain_thread = handler._drain_thread
+        stop_observer = service.observer.stop
 
-        # Verify existing timer was cancelled
-        existing_timer.cancel.assert_called_once()
+        def stop_with_late_event():
+            handler._schedule_reload("/test/late.yaml", "created")
+            stop_observer()
 
-        # Verify new timer was created and started
-        assert handler._debounce_timer is not None
-        assert handler._debounce_timer != existing_timer
+        threads_before = set(threading.enumerate())
+        with patch.object(service.observer, "stop", side_effect=stop_with_late_event):
+            service.stop()
+        # Events dispatched after the stop are queued but never processed
+        handler._schedule_reload("/test/later.yaml", "created")
+
+        assert not drain_thread.is_alive()
+        assert handler._drain_thread is None
+        new_threads = set(threading.enumerate()) - threads_before
+        assert not [
+            thread for thread in new_threads if thread.name == "file-watcher-drain"
+        ]
 
-    def test_schedule_reload_multiple_rapid_changes(self):
-        """Test multiple rapid file changes and timer management."""
-        config = Mock()
-        handler = ServiceFileHandler(config, 1)  # Use int for reload_interval
+    def test_drain_thread_idles_until_changes_are_queued(self, base_config):
+        """Test the drain thread only wakes up for queued changes."""
+        handler = ServiceFileHandler(base_config, 0.05)
+        handler.start_drain()
+        assert not handler._flush_event.is_set()
 
-        # Schedule multiple changes rapidly
-        handler._schedule_reload("/test/file1.yaml", "created")
-        first_timer = handler._debounce_timer
+        with patch.object(handler, "_process_file_change") as process_file_change:
+            handler._schedule_reload("/test/file.yaml", "created")
+            assert handler.processed_event.wait(5)
 
-        handler._schedule_reload("/test/file2.yaml", "modified")
-        second_timer = handler._debounce_timer
+        process_file_change.assert_called_once_with("/test/file.yaml")
+        # The burst was consumed: the thread is back to waiting for changes
+        assert not handler._flush_event.is_set()
+        handler.stop_drain()
 
+    def test_schedule_reload_deletion_clears_resolve_cache(self, base_config, tmp_path):
+        """Test resolved paths are memoized until a deletion is scheduled."""
+        _resolve_cached.cache_clear()
+        service_file = str(tmp_path / "service.yaml")
+
+        assert _resolve_cached(service_file) == str(Path(service_file).resolve())
+        _resolve_cached(service_file)
+        assert _resolve_cached.cache_info().hits == 1
+
+        handler = ServiceFileHandler(base_config, 5)
+        handler._schedule_reload(service_file, "deleted")
+        handler.stop_drain()
+
+        assert _resolve_cached.cache_info().currsize == 0
+
+    def test_schedule_reload_multiple_rapid_changes(self, base_config):
+        """Test multiple rapid file changes are coalesced into one batch."""
+        handler = ServiceFileHandler(base_config, 5)
+
+        # Schedule multiple changes rapidly, then stop before the first tick
+        handler._schedule_reload("/test/file1.yaml", "created")
+        handler._schedule_reload("/test/file2.yaml", "modified")
+        handler._schedule_reload("/test/file1.yaml", "modified")
         handler._schedule_reload("/test/file3.yaml", "deleted")
-        third_timer = handler._debounce_timer
+        handler.stop_drain()
+
+        assert list(handler._pending_changes) == [
+            "/test/file1.yaml",
+            "/test/file2.yaml",
+            "/test/file3.yaml",
+        ]
+        # Each path keeps the sequence number of its latest event
+        assert handler._pending_changes == {
+            "/test/file1.yaml": 3,
+            "/test/file2.yaml": 2,
+            "/test/file3.yaml": 4,
+        }
+
+        # A single pass processes each changed file once
+        with patch.object(handler, "_process_file_change") as mock_process:
+            handler._process_pending_changes()
 
-        # Verify final timer is different from first
-        assert third_timer != first_timer
-        assert third_timer != second_timer
+        assert mock_process.call_count == 3
+        assert handler._pending_changes == {}
 
-    def test_process_file_change_service_rejection_different_source(self):
+    def test_process_file_change_service_rejection_different_source(
+        self, base_config, tmpdir_shared
+    ):
         """Test service rejection when different source file for same service."""
         from credproxy.config import (
             ServiceConfig,
@@ -360,8 +436,7 @@ class TestFileWatcherAdvancedCoverage:
             SourceCredentialsConfig,
         )
 
-        config = Mock()
-        config.services = {}
+        config = base_config
 
         # Create existing service with different source
         existing_service = ServiceConfig(
@@ -369,12 +444,12 @@ class TestFileWatcherAdvancedCoverage:
             source_credentials=SourceCredentialsConfig(
                 region="us-east-1",
                 iam_keys=IAMKeysAuthConfig(
-                    aws_access_key_id=mock_access_key_id(),
-                    aws_secret_access_key=mock_secret_access_key(),
+                    aws_access_key_id=_MOCK_ACCESS_KEY,
+                    aws_secret_access_key=_MOCK_SECRET_KEY,
                 ),
             ),
             assumed_role=AssumedRoleConfig(
-                RoleArn=mock_role_arn(),
+                RoleArn=_MOCK_ROLE,
                 RoleSessionName="existing-session",
             ),
             source_file="/different/path.yaml",
@@ -384,32 +459,18 @@ class TestFileWatcherAdvancedCoverage:
 
         handler = ServiceFileHandler(config, 5)
 
-        # Create new service data
-        service_data = {
-            "auth_token": "new-token",
-            "source_credentials": {"region": "us-west-2"},
-            "assumed_role": {
-                "RoleArn": mock_role_arn(),
-                "RoleSessionName": "new-session",
-            },
-        }
-
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(service_data, f)
-            temp_file = f.name
+        # Same service name, from another file
+        temp_file = tmpdir_shared / f"{uuid4().hex}.yaml"
+        temp_file.write_text(_VALID_SERVICE_YAML)
 
-        try:
-            # Mock the source file path to be different
-            with patch("pathlib.Path.resolve", return_value="/new/path.yaml"):
-                handler._process_file_change(temp_file)
-
-            # Verify service was NOT added (different source file)
-            config.add_dynamic_services.assert_not_called()
+        # Mock the source file path to be different
+        with patch("pathlib.Path.resolve", return_value="/new/path.yaml"):
+            handler._process_file_change(str(temp_file))
 
-        finally:
-            os.unlink(temp_file)
+        # Verify service was NOT added (different source file)
+        config.add_dynamic_services.assert_not_called()
 
-    def test_process_file_change_service_removal(self):
+    def test_process_file_change_service_removal(self, base_config):
         """Test service removal when file is deleted (lines 167-172)."""
         from credproxy.config import (
             ServiceConfig,
@@ -418,8 +479,7 @@ class TestFileWatcherAdvancedCoverage:
             SourceCredentialsConfig,
         )
 
-        config = Mock()
-        config.services = {}
+        config = base_config
 
         # Create existing service
         existing_service = ServiceConfig(
@@ -427,12 +487,12 @@ class TestFileWatcherAdvancedCoverage:
             source_credentials=SourceCredentialsConfig(
                 region="us-east-1",
                 iam_keys=IAMKeysAuthConfig(
-                    aws_access_key_id=mock_access_key_id(),
-                    aws_secret_access_key=mock_secret_access_key(),
+                    aws_access_key_id=_MOCK_ACCESS_KEY,
+                    aws_secret_access_key=_MOCK_SECRET_KEY,
                 ),
             ),
             assumed_role=AssumedRoleConfig(
-                RoleArn=mock_role_arn(),
+                RoleArn=_MOCK_ROLE,
                 RoleSessionName="existing-session",
             ),
             source_file="/test/path.yaml",
@@ -449,10 +509,9 @@ class TestFileWatcherAdvancedCoverage:
         # Verify service was removed
         config.remove_service.assert_called_once_with("path")
 
-    def test_process_file_change_error_handling_in_operations(self):
+    def test_process_file_change_error_handling_in_operations(self, base_config):
         """Test error handling in service operations (lines 168-175)."""
-        config = Mock()
-        config.services = {}
+        config = base_config
 
         handler = ServiceFileHandler(config, 5)
 
@@ -493,51 +552,24 @@ class TestFileWatcherAdvancedCoverage:
                         exclude_patterns=["^\\..*", ".*~$", ".*\\.bak$"],
                     )
                 ],
-                reload_interval=1,  # Short interval for testing
+                reload_interval=0.05,  # Short interval for testing
             )
 
-            # Create valid service configuration file first
-            service_name = "test-removal-service"
+            # Create valid service configuration file first, named after the
+            # service as deletions remove the service by file name
+            service_name = _SERVICE_NAME
             service_file = Path(temp_dir) / f"{service_name}.yaml"
-            mock_access_key = mock_access_key_id()
-            mock_secret_key = mock_secret_access_key()
-            valid_config = {
-                "services": {
-                    service_name: {
-                        "auth_token": "test-token-123",
-                        "source_credentials": {
-                            "region": "us-east-1",
-                            "iam_keys": {
-                                "aws_access_key_id": mock_access_key,
-                                "aws_secret_access_key": mock_secret_key,
-                            },
-                        },
-                        "assumed_role": {
-                            "RoleArn": "arn:aws:iam::123456789012:role/TestRole",
-                            "RoleSessionName": "test-session",
-                            "DurationSeconds": 3600,
-                        },
-                    }
-                }
-            }
-
-            # Write service file
-            with open(service_file, "w", encoding="utf-8") as f:
-                yaml.dump(valid_config, f)
+            service_file.write_text(_VALID_SERVICE_YAML, encoding="utf-8")
 
             # Create file watcher service (will load existing files)
             watcher = FileWatcherService(config)
             watcher.start()
 
-            # Give watcher time to start and process existing files
-            time.sleep(0.5)
+            # Existing files are loaded synchronously by start()
             assert watcher.is_running()
 
-            # Verify service was loaded from existing file
-            assert service_name in config.services, (
-                f"Service {service_name} should be in config after file creation"
-            )
-            assert service_name in config.services, (
+            # Verify service was loaded from existing file, and only that one
+            assert set(config.services) == {service_name}, (
                 f"Service {service_name} should be in config after file creation"
             )
 
@@ -550,10 +582,12 @@ class TestFileWatcherAdvancedCoverage:
             )
 
             # Now delete the file to test service removal
+            processed = watcher.processed_event
+            processed.clear()
             service_file.unlink()
 
-            # Wait longer for deletion processing (file system events can take time)
-            time.sleep(2.0)
+            # Wait for the debounced deletion to be processed
+            assert processed.wait(timeout=5.0)
 
             # Verify service was removed from config
             assert service_name not in config.services, (
@@ -575,27 +609,13 @@ class TestFileWatcherAdvancedCoverage:
             config.dynamic_services = DynamicServicesConfig(
                 enabled=True,
                 directories=[DirectoryConfig(path=temp_dir)],
-                reload_interval=1,
+                reload_interval=0.05,
             )
 
             # Create service file first
-            service_name = "error-service"
+            service_name = _SERVICE_NAME
             service_file = Path(temp_dir) / f"{service_name}.yaml"
-            valid_config = {
-                "services": {
-                    service_name: {
-                        "auth_token": "test-token",
-                        "source_credentials": {"region": "us-east-1"},
-                        "assumed_role": {
-                            "RoleArn": "arn:aws:iam::123456789012:role/TestRole",
-                            "RoleSessionName": "test-session",
-                        },
-                    }
-                }
-            }
-
-            with open(service_file, "w", encoding="utf-8") as f:
-                yaml.dump(valid_config, f)
+            service_file.write_text(_VALID_SERVICE_YAML, encoding="utf-8")
 
             # Mock the remove_service method to raise an exception
             with patch.object(
@@ -603,14 +623,15 @@ class TestFileWatcherAdvancedCoverage:
             ):
                 watcher = FileWatcherService(config)
                 watcher.start()
-                time.sleep(0.5)
 
                 # Verify service was loaded
                 assert service_name in config.services
 
                 # Delete file to trigger removal (which should fail)
+                processed = watcher.processed_event
+                processed.clear()
                 service_file.unlink()
-                time.sleep(0.5)
+                assert processed.wait(timeout=5.0)
 
                 # Service should still be in config because removal failed
                 assert service_name in config.services, (
@@ -628,25 +649,26 @@ class TestFileWatcherAdvancedCoverage:
             config.dynamic_services = DynamicServicesConfig(
                 enabled=True,
                 directories=[DirectoryConfig(path=temp_dir)],
-                reload_interval=1,
+                reload_interval=0.05,
             )
 
             watcher = FileWatcherService(config)
             watcher.start()
-            time.sleep(0.2)
+            processed = watcher.processed_event
 
             # Create and delete a file to trigger on_deleted event
             service_file = Path(temp_dir) / "deleted-service.yaml"
             service_file.touch()  # Create empty file
 
-            # Give time for creation event to be processed
-            time.sleep(0.2)
+            # Wait for the creation event to be processed
+            assert processed.wait(timeout=5.0)
+            processed.clear()
 
             # Now delete the file
             service_file.unlink()
 
-            # Give time for deletion event to be processed
-            time.sleep(0.5)
+            # Wait for the deletion event to be processed
+            assert processed.wait(timeout=5.0)
 
             # Verify watcher is still running (no crash)
             assert watcher.is_running()
@@ -692,6 +714,69 @@ class TestFileWatcherAdvancedCoverage:
                 "TXT files should not match include patterns"
             )
 
+            # Patterns are compiled once per directory and reused across events
+            directory = str(Path(temp_dir).resolve())
+            include_re = handler._include_re[directory]
+            assert [regex.pattern for regex in include_re.regexes] == [".*\\.yaml$"]
+            handler._matches_pattern(str(included_file))
+            assert handler._include_re[directory] is include_re
+
+    def test_matches_pattern_cache(self, base_config):
+        """Test filtering results are cached per path, bounded and invalidated."""
+        handler = ServiceFileHandler(base_config, 5)
+        directory = Path(base_config.dynamic_services.directories[0].path)
+        service_file = str(directory / "service.yaml")
+
+        assert handler._matches_pattern(service_file)
+        with patch("credproxy.file_watcher._should_include") as mock_should_include:
+            assert handler._matches_pattern(service_file)
+        mock_should_include.assert_not_called()
+
+        # Bounded, evicting the oldest path first
+        with patch("credproxy.file_watcher._MATCH_CACHE_MAXSIZE", 2):
+            handler._matches_pattern(str(directory / "other.yaml"))
+            handler._matches_pattern(str(directory / "other.tmp"))
+        assert list(handler._match_cache) == [
+            str(directory / "other.yaml"),
+            str(directory / "other.tmp"),
+        ]
+
+        # A deletion may change how paths resolve
+        handler._schedule_reload(service_file, "deleted")
+        handler.stop_drain()
+        assert handler._match_cache == {}
+
+    def test_pattern_matching_many_directories(self, tmp_path):
+        """Test each directory filters with its own suffix set in one check."""
+        from credproxy.config import Config, DynamicServicesConfig
+
+        extensions = ["yaml", "yml", "json", "conf", "cfg", "svc"]
+        config = Config()
+        config.dynamic_services = DynamicServicesConfig(
+            enabled=True,
+            directories=[
+                DirectoryConfig(
+                    path=str(tmp_path / extension),
+                    include_patterns=[f".*\\.{extension}$", ".*\\.service$"],
+                    exclude_patterns=[".*\\.tmp$", ".*~$"],
+                )
+                for extension in extensions
+            ],
+        )
+        handler = ServiceFileHandler(config, 1)
+
+        for extension in extensions:
+            directory = tmp_path / extension
+            assert handler._matches_pattern(str(directory / f"a.{extension}"))
+            assert handler._matches_pattern(str(directory / "a.service"))
+            assert not handler._matches_pattern(str(directory / f"a.{extension}~"))
+            assert not handler._matches_pattern(str(directory / "a.tmp"))
+            other = "yml" if extension == "yaml" else "yaml"
+            assert not handler._matches_pattern(str(directory / f"a.{other}"))
+
+            include = handler._include_re[str(directory.resolve())]
+            assert include.suffixes == (f".{extension}", ".service")
+
     def test_debounce_timer_with_file_deletion(self):
         """Test debounce timer behavior when file is deleted (lines 204-205)."""
         from credproxy.config import Config, DynamicServicesConfig
@@ -701,10 +786,11 @@ class TestFileWatcherAdvancedCoverage:
             config.dynamic_services = DynamicServicesConfig(
                 enabled=True,
                 directories=[DirectoryConfig(path=temp_dir)],
-                reload_interval=1,  # Short interval for testing
+                reload_interval=0.05,  # Short interval for testing
             )
 
-            handler = ServiceFileHandler(config, 1)
+            handler = ServiceFileHandler(config, 0.05)
+            processed = handler.processed_event
 
             # Create a file and schedule its deletion
             test_file = Path(temp_dir) / "debounce-test.yaml"
@@ -713,16 +799,17 @@ class TestFileWatcherAdvancedCoverage:
             # Schedule reload for deletion event
             handler._schedule_reload(str(test_file), "deleted")
 
-            # Verify timer was created
-            assert handler._debounce_timer is not None
+            # Verify the drain thread was started
+            assert handler._drain_thread is not None
 
-            # Wait for timer to complete (need to wait longer than the interval)
-            time.sleep(2.0)
+            # Wait for the drain thread to process the pending change
+            assert processed.wait(timeout=5.0)
+            handler.stop_drain()
 
-            # Verify the file change was processed (timer executed)
-            # The timer should have attempted to process the file deletion
+            # Verify the file change was processed (drain thread executed)
+            # The drain thread should have attempted to process the file deletion
             # We can verify this by checking that pending changes are cleared
-            assert len(handler._pending_changes) == 0
+            assert handler._pending_changes == {}
 
     def test_service_removal_with_exception_logging(self):
         """Test service removal exception logging (lines 140-145)."""
@@ -750,12 +837,12 @@ class TestFileWatcherAdvancedCoverage:
                 source_credentials=SourceCredentialsConfig(
                     region="us-east-1",
                     iam_keys=IAMKeysAuthConfig(
-                        aws_access_key_id=mock_access_key_id(),
-                        aws_secret_access_key=mock_secret_access_key(),
+                        aws_access_key_id=_MOCK_ACCESS_KEY,
+                        aws_secret_access_key=_MOCK_SECRET_KEY,
                     ),
                 ),
                 assumed_role=AssumedRoleConfig(
-                    RoleArn=mock_role_arn(),
+                    RoleArn=_MOCK_ROLE,
                     RoleSessionName="test-session",
                 ),
                 source_file=str(Path(temp_dir) / f"{service_name}.yaml"),
@@ -835,6 +922,7 @@ class TestFileWatcherAdvancedCoverage:
             )
 
             handler = ServiceFileHandler(config, 1)
+            processed = handler.processed_event
 
             # Create multiple files and schedule their deletion
             files_to_delete = []
@@ -850,8 +938,9 @@ class TestFileWatcherAdvancedCoverage:
             # Verify all files are in pending changes
             assert len(handler._pending_changes) == 3
 
-            # Wait for timer to process all pending changes
-            time.sleep(2.0)
+            # Wait for the drain thread to process all pending changes
+            assert processed.wait(timeout=5.0)
+            handler.stop_drain()
 
             # Verify pending changes are cleared
             assert len(handler._pending_changes) == 0
@@ -865,7 +954,7 @@ class TestFileWatcherAdvancedCoverage:
             config.dynamic_services = DynamicServicesConfig(
                 enabled=True,
                 directories=[DirectoryConfig(path=temp_dir)],
-                reload_interval=1,
+                reload_interval=0.05,
             )
 
             # Create an existing service in the config
@@ -874,12 +963,12 @@ class TestFileWatcherAdvancedCoverage:
                 auth_token="existing-token",
                 source_credentials=SourceCredentialsConfig(
                     iam_keys=IAMKeysAuthConfig(
-                        aws_access_key_id=mock_access_key_id(),
-                        aws_secret_access_key=mock_secret_access_key(),
+                        aws_access_key_id=_MOCK_ACCESS_KEY,
+                        aws_secret_access_key=_MOCK_SECRET_KEY,
                     )
                 ),
                 assumed_role=AssumedRoleConfig(
-                    RoleArn=mock_role_arn(),
+                    RoleArn=_MOCK_ROLE,
                     RoleSessionName="test-session",
                 ),
                 source_file=str(Path(temp_dir) / f"{service_name}.yaml"),
@@ -889,29 +978,29 @@ class TestFileWatcherAdvancedCoverage:
             # Start file watcher
             watcher = FileWatcherService(config)
             watcher.start()
-            time.sleep(0.2)
+            processed = watcher.processed_event
 
             # Create a service file with the same name (same source)
             service_file = Path(temp_dir) / f"{service_name}.yaml"
-            mock_access_key = mock_access_key_id()
-            mock_secret_key = mock_secret_access_key()
-            mock_role = mock_role_arn()
             service_content = f"""
 services:
   test-service:
     auth_token: "updated-token"
     source_credentials:
       iam_keys:
-        aws_access_key_id: "{mock_access_key}"
-        aws_secret_access_key: "{mock_secret_key}"
+        aws_access_key_id: "{_MOCK_ACCESS_KEY}"
+        aws_secret_access_key: "{_MOCK_SECRET_KEY}"
     assumed_role:
-      RoleArn: "{mock_role}"
+      RoleArn: "{_MOCK_ROLE}"
       RoleSessionName: "test-session"
 """
             service_file.write_text(service_content)
 
-            # Give time for file to be processed
-            time.sleep(2.0)
+            # The write may be seen in more than one batch; wait for the last
+            _wait_until(
+                lambda: config.services[service_name].auth_token == "updated-token",
+                processed,
+            )
 
             # Verify service was updated (not duplicated)
             assert service_name in config.services
@@ -986,6 +1075,22 @@ services: {}
             result3 = handler._load_service_file(str(invalid_file3))
             assert result3 is None
 
+    def test_load_service_file_skips_parsing_rejected_files(self, base_config):
+        """Unsupported and service-less files are rejected before parsing."""
+        handler = ServiceFileHandler(base_config, 1)
+        directory = base_config.dynamic_services.directories[0].path
+        Path(directory).mkdir()
+        unsupported_file = Path(directory) / "service.txt"
+        unsupported_file.write_text("services: {}")
+        no_services_file = Path(directory) / "other.yaml"
+        no_services_file.write_text("other_key: value\n")
+
+        with patch("credproxy.file_watcher.yaml.load") as yaml_load:
+            assert handler._load_service_file(str(unsupported_file)) is None
+            assert handler._load_service_file(str(no_services_file)) is None
+
+        yaml_load.assert_not_called()
+
     def test_aws_defaults_merging_with_source_credentials(self):
         """Test AWS defaults merging with source credentials (lines 340-345)."""
         from credproxy.config import Config, IAMKeysAuthConfig, DynamicServicesConfig
@@ -1011,20 +1116,17 @@ services: {}
 
             # Create a service file with partial source credentials (missing region)
             service_file = Path(temp_dir) / "service.yaml"
-            mock_access_key = mock_access_key_id()
-            mock_secret_key = mock_secret_access_key()
-            mock_role = mock_role_arn()
             service_content = f"""
 services:
   test-service:
     auth_token: "test-token"
     source_credentials:
       iam_keys:
-        aws_access_key_id: "{mock_access_key}"
-        aws_secret_access_key: "{mock_secret_key}"
+        aws_access_key_id: "{_MOCK_ACCESS_KEY}"
+        aws_secret_access_key: "{_MOCK_SECRET_KEY}"
       # region missing - should come from defaults
     assumed_role:
-      RoleArn: "{mock_role}"
+      RoleArn: "{_MOCK_ROLE}"
       RoleSessionName: "test-session"
 """
             service_file.write_text(service_content)
@@ -1039,11 +1141,11 @@ services:
             # Verify that defaults were merged
             assert (
                 service_config.source_credentials.iam_keys.aws_access_key_id
-                == mock_access_key
+                == _MOCK_ACCESS_KEY
             )  # From file
             assert (
                 service_config.source_credentials.iam_keys.aws_secret_access_key
-                == mock_secret_key
+                == _MOCK_SECRET_KEY
             )  # From file
             assert (
                 service_config.source_credentials.region == "us-east-1"
@@ -1061,19 +1163,19 @@ services:
             config.dynamic_services = DynamicServicesConfig(
                 enabled=True,
                 directories=[DirectoryConfig(path=temp_dir)],
-                reload_interval=1,
+                reload_interval=0.05,
             )
 
             watcher = FileWatcherService(config)
             watcher.start()
-            time.sleep(0.2)
+            processed = watcher.processed_event
 
             # Create a file with unsupported format to trigger the warning
             unsupported_file = Path(temp_dir) / "service.txt"
             unsupported_file.write_text("unsupported content")
 
-            # Give time for file to be processed
-            time.sleep(2.0)
+            # Wait for the file to be processed
+            assert processed.wait(timeout=5.0)
 
             # Verify watcher is still running (no crash)
             assert watcher.is_running()
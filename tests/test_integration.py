@@ -6,8 +6,6 @@
 
 from __future__ import annotations
 
-import os
-import tempfile
 from unittest.mock import Mock, patch
 
 import yaml
@@ -15,12 +13,13 @@ import yaml
 from credproxy.app import init_app
 from tests.mock_aws import mock_role_arn, mock_access_key_id, mock_secret_access_key
 from credproxy.config import Config
+from tests.yaml_helpers import Dumper
 
 
 class TestAppIntegration:
     """Integration tests for Flask app."""
 
-    def test_init_app_full_integration(self):
+    def test_init_app_full_integration(self, tmp_path):
         """Test complete app initialization with all components."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -55,31 +54,26 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
+        config = Config.from_file(config_file)
+        app = init_app(config)
 
-            # Test app configuration
-            assert app.config["ENV"] == "production"
-            assert app.config["LOGGER_HANDLER_POLICY"] == "never"
-            assert "credproxy_config" in app.config
-            assert "credentials_handler" in app.config
-            assert "file_watcher" in app.config
+        # Test app configuration
+        assert app.config["ENV"] == "production"
+        assert app.config["LOGGER_HANDLER_POLICY"] == "never"
+        assert "credproxy_config" in app.config
+        assert "credentials_handler" in app.config
+        assert "file_watcher" in app.config
 
-            # Test that blueprints are registered
-            assert len(app.blueprints) > 0
+        # Test that blueprints are registered
+        assert len(app.blueprints) > 0
 
-            # Test that request handlers are registered
-            assert len(app.before_request_funcs) > 0
+        # Test that request handlers are registered
+        assert len(app.before_request_funcs) > 0
 
-        finally:
-            os.unlink(temp_file)
-
-    def test_init_app_with_file_watcher_failure(self):
+    def test_init_app_with_file_watcher_failure(self, tmp_path):
         """Test app initialization when file watcher fails to start."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -117,31 +111,26 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            # Mock file watcher to raise exception
-            with patch("credproxy.app.FileWatcherService") as mock_file_watcher:
-                mock_instance = Mock()
-                mock_instance.start.side_effect = Exception("File watcher error")
-                mock_file_watcher.return_value = mock_instance
+        config = Config.from_file(config_file)
 
-                # App should still initialize despite file watcher failure
-                app = init_app(config)
+        # Mock file watcher to raise exception
+        with patch("credproxy.app.FileWatcherService") as mock_file_watcher:
+            mock_instance = Mock()
+            mock_instance.start.side_effect = Exception("File watcher error")
+            mock_file_watcher.return_value = mock_instance
 
-                # App should be properly configured
-                assert app.config["credproxy_config"] is config
-                assert "credentials_handler" in app.config
-                assert "file_watcher" in app.config
+            # App should still initialize despite file watcher failure
+            app = init_app(config)
 
-        finally:
-            os.unlink(temp_file)
+            # App should be properly configured
+            assert app.config["credproxy_config"] is config
+            assert "credentials_handler" in app.config
+            assert "file_watcher" in app.config
 
-    def test_set_service_context_no_auth_token(self):
+    def test_set_service_context_no_auth_token(self, tmp_path):
         """Test service context setting when no auth token provided."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -169,30 +158,25 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            with app.test_request_context("/credentials"):
-                from flask import g
+        config = Config.from_file(config_file)
+        app = init_app(config)
 
-                from credproxy.app import set_service_context
+        with app.test_request_context("/credentials"):
+            from flask import g
 
-                # Call function directly to test integration
-                set_service_context()
+            from credproxy.app import set_service_context
 
-                # Verify no service context was set
-                assert not hasattr(g, "service_name")
-                assert not hasattr(g, "service_source_file")
+            # Call function directly to test integration
+            set_service_context()
 
-        finally:
-            os.unlink(temp_file)
+            # Verify no service context was set
+            assert not hasattr(g, "service_name")
+            assert not hasattr(g, "service_source_file")
 
-    def test_set_service_context_invalid_token(self):
+    def test_set_service_context_invalid_token(self, tmp_path):
         """Test service context setting with invalid auth token."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -220,32 +204,27 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            with app.test_request_context(
-                "/credentials", headers={"Authorization": "invalid-token"}
-            ):
-                from flask import g
+        config = Config.from_file(config_file)
+        app = init_app(config)
 
-                from credproxy.app import set_service_context
+        with app.test_request_context(
+            "/credentials", headers={"Authorization": "invalid-token"}
+        ):
+            from flask import g
 
-                # Call function directly to test integration
-                set_service_context()
+            from credproxy.app import set_service_context
 
-                # Verify no service context was set for invalid token
-                assert not hasattr(g, "service_name")
-                assert not hasattr(g, "service_source_file")
+            # Call function directly to test integration
+            set_service_context()
 
-        finally:
-            os.unlink(temp_file)
+            # Verify no service context was set for invalid token
+            assert not hasattr(g, "service_name")
+            assert not hasattr(g, "service_source_file")
 
-    def test_shutdown_middleware_integration(self):
+    def test_shutdown_middleware_integration(self, tmp_path):
         """Test shutdown middleware functionality."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -273,28 +252,23 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
+        config = Config.from_file(config_file)
+        app = init_app(config)
 
-            # Set shutdown flag
-            app.config["_shutdown_requested"] = True
+        # Set shutdown flag
+        app.config["_shutdown_requested"] = True
 
-            with app.test_client() as client:
-                response = client.get("/health")
+        with app.test_client() as client:
+            response = client.get("/health")
 
-                # Should return 503 during shutdown
-                assert response.status_code == 503
-                assert b"Service shutting down" in response.data
+            # Should return 503 during shutdown
+            assert response.status_code == 503
+            assert b"Service shutting down" in response.data
 
-        finally:
-            os.unlink(temp_file)
-
-    def test_service_config_with_source_file(self):
+    def test_service_config_with_source_file(self, tmp_path):
         """Test service configuration with x-source-file property."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -323,25 +297,20 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            # Test that config has service with source file
-            service = config.services.get("test-service")
-            assert service is not None
-            assert hasattr(service, "source_file")
-            # The source_file gets set to the actual config file path during loading
-            assert service.source_file is not None
-            assert service.source_file.endswith(".yaml")
+        config = Config.from_file(config_file)
 
-        finally:
-            os.unlink(temp_file)
+        # Test that config has service with source file
+        service = config.services.get("test-service")
+        assert service is not None
+        assert hasattr(service, "source_file")
+        # The source_file gets set to the actual config file path during loading
+        assert service.source_file is not None
+        assert service.source_file.endswith(".yaml")
 
-    def test_set_service_context_with_valid_token(self):
+    def test_set_service_context_with_valid_token(self, tmp_path):
         """Test service context function exists and can be called."""
         mock_access_key = mock_access_key_id()
         mock_secret_key = mock_secret_access_key()
@@ -370,21 +339,16 @@ class TestAppIntegration:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-        try:
-            config = Config.from_file(temp_file)
-
-            # Test that the function exists and can be imported
-            from credproxy.app import set_service_context
+        config = Config.from_file(config_file)
 
-            assert callable(set_service_context)
+        # Test that the function exists and can be imported
+        from credproxy.app import set_service_context
 
-            # Test that config has service for token lookup
-            service_name = config.get_service_name_by_token("test-token")
-            assert service_name == "test-service"
+        assert callable(set_service_context)
 
-        finally:
-            os.unlink(temp_file)
+        # Test that config has service for token lookup
+        service_name = config.get_service_name_by_token("test-token")
+        assert service_name == "test-service"
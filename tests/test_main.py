@@ -6,8 +6,6 @@
 
 from __future__ import annotations
 
-import os
-import tempfile
 from unittest.mock import patch
 
 import yaml
@@ -15,55 +13,39 @@ import pytest
 
 from credproxy.app import init_app
 from credproxy.config import Config
+from tests.yaml_helpers import Dumper
 
 
 class TestMainApp:
     """Test the main Flask application."""
 
-    def test_health_check_no_config(self):
+    def test_health_check_no_config(self, client):
         """Test health check endpoint when no config is loaded."""
-        # Create app with minimal config
-        config = Config()
-        app = init_app(config)
+        response = client.get("/health")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status"] == "healthy"
+        assert data["services"] == 0
 
-        with app.test_client() as client:
-            response = client.get("/health")
-            assert response.status_code == 200
-            data = response.get_json()
-            assert data["status"] == "healthy"
-            assert data["services"] == 0
-
-    def test_credentials_endpoint_no_config(self):
+    def test_credentials_endpoint_no_config(self, client):
         """Test credentials endpoint when no config is loaded."""
-        config = Config()
-        app = init_app(config)
-
-        with app.test_client() as client:
-            response = client.get("/v1/credentials")
-            assert response.status_code == 401  # Missing auth header
+        response = client.get("/v1/credentials")
+        assert response.status_code == 401  # Missing auth header
 
-    def test_credentials_endpoint_no_auth_token(self):
+    def test_credentials_endpoint_no_auth_token(self, client):
         """Test credentials endpoint without authorization token."""
-        config = Config()
-        app = init_app(config)
-
-        with app.test_client() as client:
-            response = client.get("/v1/credentials")
-            assert response.status_code == 401  # Missing auth header
+        response = client.get("/v1/credentials")
+        assert response.status_code == 401  # Missing auth header
 
-    def test_credentials_endpoint_invalid_token(self):
+    def test_credentials_endpoint_invalid_token(self, client):
         """Test credentials endpoint with invalid authorization token."""
-        config = Config()
-        app = init_app(config)
-
-        with app.test_client() as client:
-            response = client.get(
-                "/v1/credentials", headers={"Authorization": "invalid-token"}
-            )
-            assert response.status_code == 401  # Invalid token
+        response = client.get(
+            "/v1/credentials", headers={"Authorization": "invalid-token"}
+        )
+        assert response.status_code == 401  # Invalid token
 
     @patch("credproxy.credentials_handler.CredentialsHandler.get_credentials")
-    def test_credentials_endpoint_no_credentials_yet(self, mock_get_creds):
+    def test_credentials_endpoint_no_credentials_yet(self, mock_get_creds, tmp_path):
         """Test credentials endpoint when credentials not yet available."""
         config_data = {
             "aws_defaults": {
@@ -84,29 +66,24 @@ class TestMainApp:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            # Mock credentials handler to raise an exception
-            mock_get_creds.side_effect = Exception("Credentials unavailable")
+        config = Config.from_file(config_file)
+        app = init_app(config)
 
-            with app.test_client() as client:
-                response = client.get(
-                    "/v1/credentials", headers={"Authorization": "valid-token"}
-                )
-                # Should return 500 when credentials handler raises exception
-                assert response.status_code == 500
+        # Mock credentials handler to raise an exception
+        mock_get_creds.side_effect = Exception("Credentials unavailable")
 
-        finally:
-            os.unlink(temp_file)
+        with app.test_client() as client:
+            response = client.get(
+                "/v1/credentials", headers={"Authorization": "valid-token"}
+            )
+            # Should return 500 when credentials handler raises exception
+            assert response.status_code == 500
 
     @patch("credproxy.credentials_handler.CredentialsHandler.get_credentials")
-    def test_credentials_endpoint_success(self, mock_get_creds):
+    def test_credentials_endpoint_success(self, mock_get_creds, tmp_path):
         """Test successful credentials endpoint response."""
         config_data = {
             "aws_defaults": {
@@ -127,56 +104,47 @@ class TestMainApp:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
-
-            test_creds = {
-                "AccessKeyId": "TESTKEY",
-                "SecretAccessKey": "testsecret",
-                "Token": "testtoken",
-                "Expiration": 1234567890000,
-            }
-            mock_get_creds.return_value = test_creds
-
-            with app.test_client() as client:
-                response = client.get(
-                    "/v1/credentials", headers={"Authorization": "valid-token"}
-                )
-                assert response.status_code == 200
-                data = response.get_json()
-                assert data["AccessKeyId"] == "TESTKEY"
-                assert data["SecretAccessKey"] == "testsecret"
-
-        finally:
-            os.unlink(temp_file)
-
-    def test_metrics_endpoint_available(self):
-        """Test that metrics endpoint is available and returns correct format."""
-        config = Config()
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
+
+        config = Config.from_file(config_file)
         app = init_app(config)
 
+        test_creds = {
+            "AccessKeyId": "TESTKEY",
+            "SecretAccessKey": "testsecret",
+            "Token": "testtoken",
+            "Expiration": 1234567890000,
+        }
+        mock_get_creds.return_value = test_creds
+
         with app.test_client() as client:
-            response = client.get("/metrics")
+            response = client.get(
+                "/v1/credentials", headers={"Authorization": "valid-token"}
+            )
             assert response.status_code == 200
-            assert "text/plain" in response.content_type
+            data = response.get_json()
+            assert data["AccessKeyId"] == "TESTKEY"
+            assert data["SecretAccessKey"] == "testsecret"
 
-            # Check for basic Prometheus metrics format
-            metrics_data = response.data.decode()
-            assert "# HELP" in metrics_data
-            assert "# TYPE" in metrics_data
-            assert "credproxy_" in metrics_data
+    def test_metrics_endpoint_available(self, client):
+        """Test that metrics endpoint is available and returns correct format."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "text/plain" in response.content_type
+
+        # Check for basic Prometheus metrics format
+        metrics_data = response.data.decode()
+        assert "# HELP" in metrics_data
+        assert "# TYPE" in metrics_data
+        assert "credproxy_" in metrics_data
 
 
 class TestCredentialMethods:
     """Test credential retrieval methods."""
 
     @patch("boto3.client")
-    def test_get_credentials_aws_error(self, mock_boto3_client):
+    def test_get_credentials_aws_error(self, mock_boto3_client, tmp_path):
         """Test error handling for AWS API errors."""
         # Mock STS client to raise a ClientError
         mock_sts_client = mock_boto3_client.return_value
@@ -198,23 +166,18 @@ class TestCredentialMethods:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            # Import CredentialsHandler locally to avoid import issues
-            from credproxy.credentials_handler import CredentialsHandler
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
 
-            handler = CredentialsHandler(config)
+        config = Config.from_file(config_file)
+        # Import CredentialsHandler locally to avoid import issues
+        from credproxy.credentials_handler import CredentialsHandler
 
-            # Should raise exception when AWS API call fails
-            with pytest.raises(Exception, match="AWS API Error"):
-                handler.get_credentials("test-service")
+        handler = CredentialsHandler(config)
 
-        finally:
-            os.unlink(temp_file)
+        # Should raise exception when AWS API call fails
+        with pytest.raises(Exception, match="AWS API Error"):
+            handler.get_credentials("test-service")
 
     def test_credentials_format_verification(self):
         """Test that credentials response has correct format for AWS SDK."""
@@ -242,7 +205,7 @@ class TestCredentialMethods:
         assert parsed_time == expiration_time
 
     @patch("credproxy.credentials_handler.CredentialsHandler.get_credentials")
-    def test_credentials_response_format(self, mock_get_creds):
+    def test_credentials_response_format(self, mock_get_creds, tmp_path):
         """Test that credentials response has correct format for AWS SDK."""
         from datetime import datetime, timezone
 
@@ -265,61 +228,52 @@ class TestCredentialMethods:
             },
         }
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_file = f.name
-
-        try:
-            config = Config.from_file(temp_file)
-            app = init_app(config)
-
-            # Create properly formatted credentials
-            expiration_time = datetime.now(timezone.utc)
-            test_creds = {
-                "AccessKeyId": "TESTKEY",
-                "SecretAccessKey": "testsecret",
-                "Token": "testtoken",
-                "Expiration": expiration_time.isoformat(),
-            }
-
-            mock_get_creds.return_value = test_creds
-
-            with app.test_client() as client:
-                response = client.get(
-                    "/v1/credentials", headers={"Authorization": "valid-token"}
-                )
-                assert response.status_code == 200
-                data = response.get_json()
-
-                # Verify AWS SDK expected format
-                assert "AccessKeyId" in data
-                assert "SecretAccessKey" in data
-                assert "Token" in data
-                assert "Expiration" in data
-
-                # Verify Expiration is ISO 8601 string
-                assert isinstance(data["Expiration"], str)
-                # Should be parseable as ISO 8601
-                parsed_time = datetime.fromisoformat(
-                    data["Expiration"].replace("Z", "+00:00")
-                )
-                assert parsed_time == expiration_time
-
-        finally:
-            os.unlink(temp_file)
-
-    def test_metrics_endpoint_available(self):
-        """Test that metrics endpoint is available and returns correct format."""
-        config = Config()
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(yaml.dump(config_data, Dumper=Dumper))
+
+        config = Config.from_file(config_file)
         app = init_app(config)
 
+        # Create properly formatted credentials
+        expiration_time = datetime.now(timezone.utc)
+        test_creds = {
+            "AccessKeyId": "TESTKEY",
+            "SecretAccessKey": "testsecret",
+            "Token": "testtoken",
+            "Expiration": expiration_time.isoformat(),
+        }
+
+        mock_get_creds.return_value = test_creds
+
         with app.test_client() as client:
-            response = client.get("/metrics")
+            response = client.get(
+                "/v1/credentials", headers={"Authorization": "valid-token"}
+            )
             assert response.status_code == 200
-            assert "text/plain" in response.content_type
+            data = response.get_json()
 
-            # Check for basic Prometheus metrics format
-            metrics_data = response.data.decode()
-            assert "# HELP" in metrics_data
-            assert "# TYPE" in metrics_data
-            assert "credproxy_" in metrics_data
+            # Verify AWS SDK expected format
+            assert "AccessKeyId" in data
+            assert "SecretAccessKey" in data
+            assert "Token" in data
+            assert "Expiration" in data
+
+            # Verify Expiration is ISO 8601 string
+            assert isinstance(data["Expiration"], str)
+            # Should be parseable as ISO 8601
+            parsed_time = datetime.fromisoformat(
+                data["Expiration"].replace("Z", "+00:00")
+            )
+            assert parsed_time == expiration_time
+
+    def test_metrics_endpoint_available(self, client):
+        """Test that metrics endpoint is available and returns correct format."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "text/plain" in response.content_type
+
+        # Check for basic Prometheus metrics format
+        metrics_data = response.data.decode()
+        assert "# HELP" in metrics_data
+        assert "# TYPE" in metrics_data
+        assert "credproxy_" in metrics_data
@@ -201,3 +201,17 @@ class TestMockAWSGenerator:
 
         assert custom_account in role_arn
         assert "123456789012" not in role_arn
+
+    def test_seeded_generator_is_reproducible(self):
+        """Test that seeding the class generator makes picks reproducible."""
+        # The generator is shared: restore it so later tests stay random
+        state = MockAWSGenerator._rng.getstate()
+        try:
+            MockAWSGenerator._rng.seed(0)
+            first = [MockAWSGenerator.mock_role_arn() for _ in range(5)]
+            MockAWSGenerator._rng.seed(0)
+            second = [MockAWSGenerator.mock_role_arn() for _ in range(5)]
+        finally:
+            MockAWSGenerator._rng.setstate(state)
+
+        assert first == second
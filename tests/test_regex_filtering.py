@@ -6,8 +6,12 @@ import tempfile
 from pathlib import Path
 from unittest.mock import Mock
 
-from credproxy.config import DirectoryConfig
-from credproxy.file_watcher import should_include_file
+from credproxy.config import DirectoryConfig, compile_pattern
+from credproxy.file_watcher import (
+    _cached_patterns,
+    _compile_patterns,
+    should_include_file,
+)
 
 
 class TestRegexFiltering:
@@ -100,6 +104,45 @@ class TestRegexFiltering:
         result = should_include_file(file_path, [r"(?i).*\.yaml$"], [])
         assert result is True
 
+    def test_compile_patterns_union(self):
+        """Test that several patterns are combined into one alternation."""
+        include = _compile_patterns(
+            [r"^/test/.*\.yaml$", r"^/test/.*\.yml$"], "include"
+        )
+
+        assert len(include.regexes) == 1
+        assert include.match("/test/service.yml")
+        assert not include.match("/test/service.json")
+
+    def test_compile_patterns_union_fallback(self):
+        """Test patterns that cannot be combined are kept separate."""
+        # Inline global flags are only valid at the start of a whole pattern
+        include_patterns = [r"^/test/.*\.json$", r"(?i).*\.yaml$"]
+
+        assert len(_compile_patterns(include_patterns, "include").regexes) == 2
+        assert should_include_file("/test/SERVICE.YAML", include_patterns, [])
+
+    def test_should_include_file_compiles_patterns_once(self):
+        """Test repeated filtering with the same patterns reuses the compiled set."""
+        _cached_patterns.cache_clear()
+
+        for file_path in ("/test/a.yaml", "/test/b.yaml", "/test/c.json"):
+            should_include_file(file_path, [r".*\.yaml$"], [r".*\.tmp$"])
+
+        # One entry for the include patterns and one for the exclude patterns
+        assert _cached_patterns.cache_info().misses == 2
+
+    def test_compile_patterns_suffixes(self):
+        """Test that plain suffix patterns are matched without the regex engine."""
+        exclude = _compile_patterns([r".*\.tmp$", r".*~$"], "exclude")
+
+        assert exclude.suffixes == (".tmp", "~")
+        assert exclude.match("/test/service.tmp")
+        assert exclude.match("/test/service.yaml~")
+        assert not exclude.match("/test/service.yaml")
+        # "$" also matches before a trailing newline
+        assert exclude.match("/test/service.tmp\n")
+
     def test_should_include_file_directory_patterns(self):
         """Test patterns that include directory paths."""
         file_path = "/test/services/prod/service.yaml"
@@ -168,6 +211,13 @@ class TestRegexFiltering:
         result = should_include_file(file_path, [r".*\.yaml$"], ["[invalid*regex"])
         assert result is True
 
+    def test_compile_pattern_is_cached(self):
+        """Test that identical pattern strings share one compiled regex."""
+        pattern = compile_pattern(r".*\.yaml$")
+
+        assert pattern is compile_pattern(r".*\.yaml$")
+        assert pattern.match("/test/service.yaml")
+
     def test_should_include_file_special_characters(self):
         """Test patterns with special regex characters."""
         file_path = "/test/service-v1.2.3.yaml"
@@ -4,14 +4,16 @@
 
 from __future__ import annotations
 
+import json
 import shutil
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 
 from tests.mock_aws import mock_role_arn, mock_access_key_id, mock_secret_access_key
-from credproxy.config import Config
+from credproxy.config import Config, _schema_validator
 
 
 class TestJSONSchemaValidation:
@@ -101,6 +103,22 @@ class TestJSONSchemaValidation:
         with pytest.raises(ValueError, match="Configuration validation failed"):
             Config.validate_schema(config_data)
 
+    @pytest.mark.parametrize(
+        "config_data",
+        [
+            {"services": {}},
+            {"services": {}, "dynamic_services": {"enabled": False}},
+        ],
+        ids=["empty_services", "dynamic_services_disabled"],
+    )
+    def test_invalid_no_service_source_fails_fast(self, config_data):
+        """Test configurations without any service source skip the validator."""
+        with patch("credproxy.config._schema_validator") as schema_validator:
+            with pytest.raises(ValueError, match="Configuration validation failed"):
+                Config.validate_schema(config_data)
+
+        schema_validator.assert_not_called()
+
     def test_invalid_service_missing_auth_token(self):
         """Test validation fails when service is missing auth_token."""
         mock_access_key = mock_access_key_id()
@@ -199,7 +217,11 @@ class TestJSONSchemaValidation:
             }
         }
 
-        with pytest.raises(ValueError, match="Configuration validation failed"):
+        with pytest.raises(
+            ValueError,
+            match="Configuration validation failed at services -> test-service -> "
+            "source_credentials -> region: invalid AWS region 'Invalid-Region'",
+        ):
             Config.validate_schema(config_data)
 
     def test_invalid_iam_keys_missing_required(self):
@@ -432,6 +454,25 @@ class TestJSONSchemaValidation:
                 shutil.copy2(temp_backup, original_schema_path)
             Path(temp_backup).unlink(missing_ok=True)
 
+    def test_schema_loaded_once(self):
+        """Test the schema file is read once and its validator reused."""
+        config_data = {
+            "services": {
+                "test-service": {
+                    "auth_token": "test-token",
+                    "source_credentials": {"region": "us-east-1"},
+                    "assumed_role": {"RoleArn": mock_role_arn()},
+                }
+            }
+        }
+        _schema_validator.cache_clear()
+
+        with patch("credproxy.config.json.load", wraps=json.load) as load:
+            Config.validate_schema(config_data)
+            Config.validate_schema(config_data)
+
+        assert load.call_count == 1
+
     def test_valid_assumed_role_with_all_new_properties(self):
         """Test validation of assumed_role with all new boto3-aligned properties."""
         mock_access_key = mock_access_key_id()
@@ -9,11 +9,13 @@ from __future__ import annotations
 import os
 import re
 import tempfile
+from unittest.mock import patch
 
 import pytest
 
+from credproxy import substitutions
 from credproxy.settings import FROM_ENV_TAG, FROM_FILE_TAG, TAG_SEPARATOR
-from credproxy.substitutions import substitute_variables
+from credproxy.substitutions import _read_file, substitute_variables
 
 
 def env_var(name: str) -> str:
@@ -108,6 +110,42 @@ class TestSubstituteVariables:
         del os.environ["OUTER_VAR"]
         del os.environ["INNER_VAR"]
 
+    def test_substitute_without_variables_returns_same_object(self):
+        """Test that values without variables are not copied."""
+        input_dict = {
+            "key1": "static_value",
+            "nested": {"subkey": ["item", 1, None]},
+        }
+        assert substitute_variables(input_dict) is input_dict
+
+    def test_substitute_shares_unchanged_branches(self):
+        """Test that only branches containing variables are rebuilt."""
+        os.environ["TEST_VAR"] = "shared_value"
+        static_branch = {"subkey": "static_value"}
+        input_dict = {"key1": env_var("TEST_VAR"), "static": static_branch}
+        result = substitute_variables(input_dict)
+        assert result == {"key1": "shared_value", "static": static_branch}
+        assert result is not input_dict
+        assert result["static"] is static_branch
+        del os.environ["TEST_VAR"]
+
+    def test_substitute_scans_for_variables_once(self, monkeypatch):
+        """Test nested values are not re-scanned for variables at every level."""
+        monkeypatch.setenv("TEST_VAR", "nested_value")
+        input_dict = {"a": {"b": {"c": [env_var("TEST_VAR"), "static"]}}}
+
+        with patch(
+            "credproxy.substitutions._needs_substitution",
+            wraps=substitutions._needs_substitution,
+        ) as needs_substitution:
+            result = substitute_variables(input_dict)
+
+        assert result == {"a": {"b": {"c": ["nested_value", "static"]}}}
+        # A single scan visits every container once
+        scanned = [call.args[0] for call in needs_substitution.call_args_list]
+        for node in (input_dict, input_dict["a"], input_dict["a"]["b"]):
+            assert sum(value is node for value in scanned) == 1
+
 
 class TestSubstituteEnv:
     """Test environment variable substitution through the public API."""
@@ -151,6 +189,21 @@ class TestSubstituteFile:
         finally:
             os.unlink(temp_file)
 
+    def test_substitute_file_read_once_per_load(self, tmp_path):
+        """Test a file referenced several times is read once per substitution."""
+        secret_file = tmp_path / "secret"
+        secret_file.write_text("first\n")
+
+        with patch("credproxy.substitutions._read_file", wraps=_read_file) as read_file:
+            result = substitute_variables([file_var(str(secret_file))] * 3)
+            assert result == ["first", "first", "first"]
+            assert read_file.call_count == 1
+
+            # Rotated in place with the same size: the next load sees it
+            secret_file.write_text("again\n")
+            assert substitute_variables(file_var(str(secret_file))) == "again"
+            assert read_file.call_count == 2
+
     def test_substitute_file_missing(self):
         """Test substituting missing file."""
         with pytest.raises(ValueError, match="File '/nonexistent/file' not found"):
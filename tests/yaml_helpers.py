@@ -0,0 +1,16 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at https://mozilla.org/MPL/2.0/.
+
+"""YAML helpers shared by the test modules."""
+
+from __future__ import annotations
+
+
+try:
+    from yaml import CSafeDumper as Dumper
+except ImportError:
+    # PyYAML built without libyaml
+    from yaml import SafeDumper as Dumper
+
+__all__ = ["Dumper"]